@@ -32,4 +32,7 @@ AUTH_SHEET_ID = os.getenv("AUTH_SHEET_ID", "13on93GUGOMSHzMw3JemVnQQj0KRfFh-qf5x
 
 DEFAULT_DURATION_SECONDS = 3600
 
+# Debugging: also write the FFmpeg concat listing to *_music_concat.txt
+KEEP_CONCAT_FILES = os.getenv('MP4_LOOPER_KEEP_CONCAT', '') == '1'
+
 VERSION = "1.2.2"
\ No newline at end of file
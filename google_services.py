@@ -42,6 +42,7 @@ class GoogleServicesManager:
             self._last_service_refresh = {}
             self._connection_errors = 0
             self._max_connection_errors = 3
+            self._sheets_lock = threading.Lock()
             self._initialized = True
             
             logging.debug("Google Services Manager initialized")
@@ -103,26 +104,33 @@ class GoogleServicesManager:
             not self._should_refresh_service('sheets')):
             return self._sheets_service
         
-        try:
-            track_api_call_simple("sheets_service_create", success=False)
+        # Serialize creation so concurrent callers share one credential load and build
+        with self._sheets_lock:
+            if (not force_refresh and 
+                self._sheets_service and 
+                not self._should_refresh_service('sheets')):
+                return self._sheets_service
             
-            credentials = self._load_credentials()
-            if not credentials:
+            try:
+                track_api_call_simple("sheets_service_create", success=False)
+                
+                credentials = self._load_credentials()
+                if not credentials:
+                    return None
+                
+                self._sheets_service = build('sheets', 'v4', credentials=credentials)
+                self._last_service_refresh['sheets'] = time.time()
+                
+                track_api_call_simple("sheets_service_create", success=True)
+                logging.debug("Google Sheets service created/refreshed")
+                
+                return self._sheets_service
+                
+            except Exception as e:
+                error_msg = f"Failed to create Sheets service: {e}"
+                logging.error(error_msg)
+                track_api_call_simple("sheets_service_create", success=False, error_message=str(e))
                 return None
-            
-            self._sheets_service = build('sheets', 'v4', credentials=credentials)
-            self._last_service_refresh['sheets'] = time.time()
-            
-            track_api_call_simple("sheets_service_create", success=True)
-            logging.debug("Google Sheets service created/refreshed")
-            
-            return self._sheets_service
-            
-        except Exception as e:
-            error_msg = f"Failed to create Sheets service: {e}"
-            logging.error(error_msg)
-            track_api_call_simple("sheets_service_create", success=False, error_message=str(e))
-            return None
     
     def get_drive_service(self, force_refresh: bool = False):
         """Get Google Drive API service with caching"""
@@ -28,7 +28,7 @@ class HelpWindow(ctk.CTkToplevel):
         self.textbox.pack(padx=20, pady=10, fill="both", expand=True)
 
         self.load_help_text()
-        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)  # Kept for reuse by the main window
 
         # Only center if auto_center is True (off by default)
         if auto_center:
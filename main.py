@@ -7,6 +7,7 @@ import re
 import sys
 import time
 import customtkinter as ctk
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tkinter import messagebox
 from dotenv import load_dotenv
@@ -27,6 +28,10 @@ from auth_module.email_auth import handle_authentication
 
 from settings_manager import get_settings
 
+# Sheet URL patterns, compiled once
+_SHEET_ID_RE = re.compile(r'/d/([a-zA-Z0-9_-]+)')
+_GID_RE = re.compile(r'gid=(\d+)')
+
 class MP4LooperApp:
     def __init__(self):
         setup_logging()
@@ -256,7 +261,12 @@ class MP4LooperApp:
         """Process dropped files and return new items and duplicates"""
         new_items = []
         duplicates = []
-        
+        for path, is_duplicate in self.iter_process_dropped_files(file_paths):
+            (duplicates if is_duplicate else new_items).append(path)
+        return new_items, duplicates
+
+    def iter_process_dropped_files(self, file_paths):
+        """Yield (path, is_duplicate) for dropped files as folders are scanned"""
         for path in file_paths:
             path = path.replace("{", "").replace("}", "")  # Clean up any braces from Windows paths
             
@@ -266,39 +276,30 @@ class MP4LooperApp:
                 target_file = os.path.join(path, f"{folder_name}.mp4")
                 
                 if os.path.isfile(target_file) and "_edit" not in target_file.lower():
-                    if target_file in self.ui.file_paths:
-                        duplicates.append(target_file)
-                        continue
                     # Add the file from within the folder
-                    new_items.append(target_file)
+                    yield target_file, target_file in self.ui.file_paths
                 else:
                     # If no matching file found, scan for all valid MP4 files
-                    mp4_files = []
+                    found = False
                     try:
                         for file in os.listdir(path):
                             if file.lower().endswith('.mp4') and '_edit' not in file.lower():
                                 full_path = os.path.join(path, file)
                                 if full_path not in self.ui.file_paths:
-                                    mp4_files.append(full_path)
+                                    # Add each valid MP4 file from the folder as it is found
+                                    found = True
+                                    yield full_path, False
                     except Exception as e:
                         logging.error(f"Error scanning folder {path}: {e}")
                     
-                    if mp4_files:
-                        # Add all valid MP4 files from the folder
-                        new_items.extend(mp4_files)
-                    else:
-                        # Show a warning if no valid files found
-                        messagebox.showwarning("No Valid Files", f"No valid MP4 files found in folder: {folder_name}")
+                    if not found:
+                        # Show a warning if no valid files found (on the UI thread; drops are scanned in a worker)
+                        self.ui.after(0, lambda name=folder_name: messagebox.showwarning(
+                            "No Valid Files", f"No valid MP4 files found in folder: {name}"))
                         
             elif os.path.isfile(path) and path.lower().endswith('.mp4'):
                 # For individual files
-                if path in self.ui.file_paths:
-                    duplicates.append(path)
-                    continue
-                    
-                new_items.append(path)
-        
-        return new_items, duplicates
+                yield path, path in self.ui.file_paths
 
     def process_selected_files(self, files):
         """Process manually selected files and return new items and duplicates"""
@@ -361,6 +362,10 @@ class MP4LooperApp:
         ui.update_progress(5, f"✅ Ready to process {total_files} files")
         time.sleep(0.5)
         
+        # The next file's song list and music are prepared here while the current file renders
+        song_list_pool = ThreadPoolExecutor(max_workers=1)
+        prefetched = None  # (file_path, future)
+        
         # Process each file with detailed progress
         for index, file_path in enumerate(file_paths[:]):
             if not self.rendering or not ui.rendering:
@@ -407,12 +412,21 @@ class MP4LooperApp:
                 f"🎵 Generating song list for {file_name}..."
             )
             
-            if not self.generate_song_list_with_progress(
-                song_list_filename, duration, output_folder, music_folder, 
-                sheet_url, new_song_count, export_timestamp, ui, 
-                file_base_progress + (file_progress_range * 0.2),
-                file_base_progress + (file_progress_range * 0.5)
-            ):
+            if prefetched and prefetched[0] == file_path:
+                song_list_ok = self.finish_prefetched_song_list(
+                    prefetched[1], music_folder, ui,
+                    file_base_progress + (file_progress_range * 0.5)
+                )
+            else:
+                song_list_ok = self.generate_song_list_with_progress(
+                    song_list_filename, duration, output_folder, music_folder, 
+                    sheet_url, new_song_count, export_timestamp, ui, 
+                    file_base_progress + (file_progress_range * 0.2),
+                    file_base_progress + (file_progress_range * 0.5)
+                )
+            prefetched = None
+            
+            if not song_list_ok:
                 logging.error("Failed to generate song list, skipping file")
                 ui.update_progress(
                     file_base_progress + (file_progress_range * 0.5), 
@@ -420,6 +434,24 @@ class MP4LooperApp:
                 )
                 continue
             
+            # Start the next file's song list so it overlaps this render. Skipped when the next
+            # file has the same base name, since both would write the same song list/temp music.
+            if index + 1 < total_files and self.rendering and ui.rendering:
+                next_path = file_paths[index + 1]
+                next_base = os.path.splitext(os.path.basename(next_path))[0]
+                if next_base != base_name:
+                    prefetched = (next_path, song_list_pool.submit(
+                        generate_song_list_for_batch,
+                        sheet_url=self.direct_sheet_url(sheet_url),
+                        output_filename=f"{next_base}_song_list.txt",
+                        duration_in_seconds=duration,
+                        music_folder=music_folder,
+                        output_folder=output_folder,
+                        new_song_count=new_song_count,
+                        export_song_list=True,
+                        export_timestamp=export_timestamp
+                    ))
+            
             # STEP 4: Video rendering (50% of file progress)
             ui.update_progress(
                 file_base_progress + (file_progress_range * 0.5), 
@@ -448,6 +480,11 @@ class MP4LooperApp:
                     f"❌ Failed to render {file_name}"
                 )
         
+        # A prefetch left over after Stop belongs to a file that won't be rendered
+        if prefetched:
+            self.discard_prefetched_song_list(prefetched, song_list_pool, output_folder)
+        song_list_pool.shutdown(wait=False)
+        
         # STEP 6: Cleanup and completion (final 5%)
         ui.update_progress(95, "🧹 Cleaning up temporary files...")
         time.sleep(0.5)
@@ -483,14 +520,7 @@ class MP4LooperApp:
             )
             
             # Convert edit URL to the direct API access URL if needed
-            if "edit" in sheet_url or "#gid=" in sheet_url:
-                sheet_id = re.search(r'/d/([a-zA-Z0-9_-]+)', sheet_url).group(1)
-                match = re.search(r'gid=(\d+)', sheet_url)
-                gid = match.group(1) if match else "0"
-                
-                direct_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&gid={gid}"
-                logging.info(f"Converted sheet URL to direct access: {direct_url}")
-                sheet_url = direct_url
+            sheet_url = self.direct_sheet_url(sheet_url)
             
             # Step 2: Connecting to Google Sheets (30% of song list progress)
             ui.update_progress(
@@ -528,29 +558,42 @@ class MP4LooperApp:
                 export_timestamp=export_timestamp
             )
             
-            if isinstance(result, tuple) and result[0] == "missing":
-                missing_files = result[1]
-                ui.update_progress(
-                    start_progress + (progress_range * 0.95),
-                    f"❌ Missing {len(missing_files)} WAV files"
-                )
-                message = (
-                    "Could not generate background music.\n\n"
-                    f"Missing .wav files in:\n{music_folder}\n\n"
-                    + "\n".join(missing_files[:10]) + 
-                    ("\n..." if len(missing_files) > 10 else "")
-                )
-                messagebox.showerror("Missing WAV Files", message)
-                return False
+            return self.check_song_list_result(result, music_folder, ui, end_progress)
             
-            # Step 6: Song list completed (100% of song list progress)
+        except Exception as e:
             ui.update_progress(
                 end_progress,
-                "✅ Song list generated successfully"
+                f"❌ Song list generation failed: {str(e)[:50]}..."
             )
-            
-            return bool(result)
-            
+            logging.error(f"Error generating song list (batch): {e}")
+            return False
+
+    def discard_prefetched_song_list(self, prefetched, song_list_pool, output_folder):
+        """Cancel an unused song list prefetch, or let it finish and delete its files"""
+        file_path, future = prefetched
+        if future.cancel():
+            return
+        
+        # Already running - wait so its FFmpeg concat ends and nothing is written after cleanup
+        song_list_pool.shutdown(wait=True)
+        
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        for suffix in ("_song_list.txt", "_song_list_timestamp.txt", "_song_list_timestamp_full.txt",
+                       "_music_concat.txt", "_temp_music.wav"):
+            path = os.path.join(output_folder, f"{base_name}{suffix}")
+            try:
+                os.remove(path)
+                logging.info(f"🗑️ Removed unused prefetched file: {path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"⚠️ Could not remove prefetched file {path}: {e}")
+
+    def finish_prefetched_song_list(self, future, music_folder, ui, end_progress):
+        """Wait for a song list started during the previous render and report it"""
+        ui.update_progress(end_progress, "🎵 Finishing song list prepared during the last render...")
+        try:
+            result = future.result()
         except Exception as e:
             ui.update_progress(
                 end_progress,
@@ -558,6 +601,45 @@ class MP4LooperApp:
             )
             logging.error(f"Error generating song list (batch): {e}")
             return False
+        
+        return self.check_song_list_result(result, music_folder, ui, end_progress)
+
+    def check_song_list_result(self, result, music_folder, ui, end_progress):
+        """Report a song list result - missing WAVs get an error dialog"""
+        if isinstance(result, tuple) and result[0] == "missing":
+            missing_files = result[1]
+            ui.update_progress(
+                end_progress,
+                f"❌ Missing {len(missing_files)} WAV files"
+            )
+            message = (
+                "Could not generate background music.\n\n"
+                f"Missing .wav files in:\n{music_folder}\n\n"
+                + "\n".join(missing_files[:10]) + 
+                ("\n..." if len(missing_files) > 10 else "")
+            )
+            messagebox.showerror("Missing WAV Files", message)
+            return False
+        
+        # Step 6: Song list completed (100% of song list progress)
+        ui.update_progress(
+            end_progress,
+            "✅ Song list generated successfully"
+        )
+        
+        return bool(result)
+
+    def direct_sheet_url(self, sheet_url):
+        """Convert an edit URL to the direct CSV access URL (other URLs pass through)"""
+        if "edit" in sheet_url or "#gid=" in sheet_url:
+            sheet_id = _SHEET_ID_RE.search(sheet_url).group(1)
+            match = _GID_RE.search(sheet_url)
+            gid = match.group(1) if match else "0"
+            
+            direct_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&gid={gid}"
+            logging.info(f"Converted sheet URL to direct access: {direct_url}")
+            return direct_url
+        return sheet_url
 
     def process_files_distributed_with_progress(self, params, ui, distribution_settings):
         """Process files in distribution mode with enhanced progress - COMPLETE FIXED VERSION"""
@@ -962,7 +1044,7 @@ class MP4LooperApp:
                 gpu_test_result = subprocess.run([
                     ffmpeg_path, "-f", "lavfi", "-i", "testsrc=duration=1:size=320x240:rate=1",
                     "-c:v", "h264_nvenc", "-preset", "fast", "-f", "null", "-"
-                ], capture_output=True, timeout=10,
+                ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=10,
                 creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0)
                 
                 if gpu_test_result.returncode != 0:
@@ -1116,7 +1198,7 @@ class MP4LooperApp:
 
             self.current_process = subprocess.Popen(
                 ffmpeg_cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,  # output goes to a file; only stderr is monitored
                 stderr=subprocess.PIPE,
                 text=True,
                 startupinfo=startupinfo,
@@ -1130,10 +1212,11 @@ class MP4LooperApp:
             import threading
             import queue
             import time
+            from collections import deque
             
             # Create a queue for thread-safe progress updates
             progress_queue = queue.Queue()
-            stderr_lines = []  # Collect all stderr for debugging
+            stderr_lines = deque(maxlen=20)  # Last stderr lines, kept for failure reports
             
             def monitor_ffmpeg_progress():
                 """Monitor FFmpeg stderr for progress info"""
@@ -1240,7 +1323,7 @@ class MP4LooperApp:
                 
                 # Look for specific filter-related errors
                 filter_errors = []
-                for line in stderr_lines[-20:]:
+                for line in stderr_lines:
                     if any(keyword in line.lower() for keyword in [
                         'filter', 'convert', 'format', 'hwaccel', 'cuda'
                     ]):
@@ -1257,7 +1340,7 @@ class MP4LooperApp:
                     error_msg += f"\n\nFilter errors:\n" + "\n".join(filter_errors[-3:])
                 
                 logging.error("❌ GPU rendering failed - operation cancelled")
-                for line in stderr_lines[-10:]:
+                for line in list(stderr_lines)[-10:]:
                     logging.error(f"FFmpeg stderr: {line}")
                 
                 messagebox.showerror("GPU Rendering Failed", error_msg, parent=ui)
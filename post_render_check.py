@@ -90,10 +90,6 @@ def validate_render(file_path, expected_duration, min_tolerance=0.95):
 
 def get_wav_duration(file_path):
     """Get WAV duration using proper FFprobe detection - FIXED VERSION"""
-    if not os.path.exists(file_path):
-        logging.error(f"❌ File not found: {file_path}")
-        return 0
-
     # Use the same FFprobe detection as the rest of the app
     ffprobe_path = find_ffprobe()
     if not ffprobe_path:
@@ -113,7 +109,11 @@ def get_wav_duration(file_path):
         ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **extra_args)
 
         if result.returncode != 0:
-            logging.error(f"❌ FFprobe failed for {file_path}: {result.stderr.strip()}")
+            # Only stat the file once FFprobe has failed, to report the likely cause
+            if not os.path.exists(file_path):
+                logging.error(f"❌ File not found: {file_path}")
+            else:
+                logging.error(f"❌ FFprobe failed for {file_path}: {result.stderr.strip()}")
             return 0
 
         duration_str = result.stdout.strip()
@@ -1,28 +1,61 @@
 import os
+import json
 import logging
 import random
 import sys
 import re
 import unicodedata
 import subprocess
+import time
+import struct
 
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import accumulate, chain, islice
+from googleapiclient.errors import HttpError
 
-from paths import get_base_path
+from paths import get_base_path, get_path_manager
 from post_render_check import get_wav_duration
-from google_services import get_sheets_service
+from google_services import get_sheets_service, get_drive_service
 from api_monitor_module.utils.monitor_access import track_api_call_simple
 from ffmpeg_utils import find_executable
+from config import KEEP_CONCAT_FILES
 
 logging.debug(f"✅ {os.path.basename(__file__)} loaded successfully")
 
+# Sheet URL patterns, compiled once for batch runs
+_SHEET_ID_RE = re.compile(r'/d/([a-zA-Z0-9_-]+)')
+_GID_RE = re.compile(r'gid=(\d+)')
+
+# Song number in column A, surrounding whitespace allowed
+_SONG_ID_RE = re.compile(r'\s*(\d+)\s*$')
+
+# Sheets read quota is per minute; retry transient errors instead of failing the batch
+_SHEETS_MAX_CALLS_PER_MINUTE = 60
+_SHEETS_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Each duration probe is an FFprobe subprocess, so several can run at once
+_PROBE_WORKERS = 8
+
+# Concurrent FFmpeg stream-copy concats in distributed mode
+_CONCAT_WORKERS = 4
+
+# (path, mtime) -> WAV duration, shared across batch calls on the same music folder
+_wav_duration_cache = {}
+
 class SongListGenerator:
     """Optimized song list generator for batch processing"""
     
     def __init__(self):
         self.sheets_service = None
+        self.drive_service = None  # only used for the spreadsheet version check
         self.cached_song_data = {}
+        self.cached_parsed_data = {}  # sheet_url -> parsed songs/weeks (see _load_parsed_sheet)
         self.last_sheet_url = None
+        self._parsed_urls = {}  # sheet_url -> (sheet_id, gid)
+        self._call_times = deque()  # monotonic timestamps of recent Sheets calls
         
     def _ensure_connection(self):
         """Ensure we have a Google Sheets connection using centralized manager"""
@@ -39,6 +72,35 @@ class SongListGenerator:
                 logging.error("Failed to establish Google Sheets connection")
                 raise Exception("Could not connect to Google Sheets")
     
+    def _wait_for_quota(self):
+        """Pace Sheets calls so we stay under the per-minute read quota"""
+        now = time.monotonic()
+        while self._call_times and now - self._call_times[0] >= 60:
+            self._call_times.popleft()
+        
+        if len(self._call_times) >= _SHEETS_MAX_CALLS_PER_MINUTE:
+            wait_time = 60 - (now - self._call_times[0])
+            logging.info(f"⏳ Sheets quota pacing, waiting {wait_time:.1f}s")
+            time.sleep(wait_time)
+            self._call_times.popleft()
+        
+        self._call_times.append(time.monotonic())
+    
+    def _execute_with_backoff(self, request, max_retries=5):
+        """Execute a Sheets request, retrying quota/server errors with exponential backoff"""
+        for attempt in range(max_retries + 1):
+            self._wait_for_quota()
+            try:
+                return request.execute()
+            except HttpError as e:
+                if e.resp.status not in _SHEETS_RETRY_STATUSES or attempt == max_retries:
+                    raise
+                
+                wait_time = min(2 ** attempt + random.random(), 32)
+                logging.warning(f"⚠️ Sheets request failed with HTTP {e.resp.status}, retrying in {wait_time:.1f}s")
+                track_api_call_simple("sheets_song_retry", success=False, error_message=str(e))
+                time.sleep(wait_time)
+    
     def _load_sheet_data(self, sheet_url):
         """Load song data from sheet (cached for batch processing)"""
         # Check if we already have this data cached
@@ -46,65 +108,139 @@ class SongListGenerator:
             logging.info("📊 Using cached song data")
             return self.cached_song_data[sheet_url]
         
-        # Extract sheet ID and gid
-        sheet_id_match = re.search(r'/d/([a-zA-Z0-9_-]+)', sheet_url)
-        if not sheet_id_match:
-            raise ValueError(f"Invalid sheet URL format: {sheet_url}")
-            
-        sheet_id = sheet_id_match.group(1)
-        gid_match = re.search(r'gid=(\d+)', sheet_url)
-        gid = gid_match.group(1) if gid_match else "0"
+        sheet_id, gid = self._parse_sheet_url(sheet_url)
+        
+        # Rows persisted by an earlier run are reused while the spreadsheet is unchanged
+        version = self._get_sheet_version(sheet_id)
+        rows = self._load_cached_rows(sheet_id, gid, version)
+        if rows is not None:
+            self.cached_song_data[sheet_url] = rows
+            self.cached_parsed_data.pop(sheet_url, None)
+            self.last_sheet_url = sheet_url
+            logging.info(f"📊 Loaded {len(rows)} rows from disk cache (version {version})")
+            return rows
         
-        # Get sheet info (only if not cached)
-        if sheet_url != self.last_sheet_url:
-            track_api_call_simple("sheets_song_info", success=False)
+        # Read the tab straight from its gid: one call, no title lookup first
+        track_api_call_simple("sheets_song_read", success=False)
+        
+        try:
+            result = self._execute_with_backoff(
+                self.sheets_service.spreadsheets().values().batchGetByDataFilter(
+                    spreadsheetId=sheet_id,
+                    body={"dataFilters": [{"gridRange": {
+                        "sheetId": int(gid), "startColumnIndex": 0, "endColumnIndex": 5
+                    }}]}
+                )
+            )
             
-            try:
-                spreadsheet_info = self.sheets_service.spreadsheets().get(
-                    spreadsheetId=sheet_id
-                ).execute()
-                track_api_call_simple("sheets_song_info", success=True)
-            except Exception as e:
-                track_api_call_simple("sheets_song_info", success=False, error_message=str(e))
-                raise
+            value_ranges = result.get('valueRanges', [])
+            if not value_ranges:
+                raise ValueError(f"Could not find sheet with gid={gid}")
             
-            # Find sheet name
-            sheet_name = None
-            for sheet in spreadsheet_info.get('sheets', []):
-                if str(sheet.get('properties', {}).get('sheetId', '')) == gid:
-                    sheet_name = sheet.get('properties', {}).get('title')
-                    break
+            rows = value_ranges[0].get('valueRange', {}).get('values', [])
+            if not rows:
+                raise ValueError("No data found in sheet")
             
-            if not sheet_name:
-                raise ValueError(f"Could not find sheet with gid={gid}")
-        
-        # Read sheet data (only if not cached)
-        if sheet_url != self.last_sheet_url:
-            track_api_call_simple("sheets_song_read", success=False)
+            track_api_call_simple("sheets_song_read", success=True, rows_read=len(rows))
             
-            try:
-                result = self.sheets_service.spreadsheets().values().get(
-                    spreadsheetId=sheet_id,
-                    range=f"'{sheet_name}'!A:E"
-                ).execute()
-                
-                rows = result.get('values', [])
-                if not rows:
-                    raise ValueError("No data found in sheet")
-                
-                track_api_call_simple("sheets_song_read", success=True, rows_read=len(rows))
-                
-                # Cache the data
-                self.cached_song_data[sheet_url] = rows
-                self.last_sheet_url = sheet_url
-                
-                logging.info(f"📊 Loaded {len(rows)} rows from Google Sheet")
-            except Exception as e:
-                track_api_call_simple("sheets_song_read", success=False, error_message=str(e))
-                raise
+            # Cache the data (and drop any parse of the previous rows)
+            self.cached_song_data[sheet_url] = rows
+            self.cached_parsed_data.pop(sheet_url, None)
+            self.last_sheet_url = sheet_url
+            self._save_cached_rows(sheet_id, gid, version, rows)
+            
+            logging.info(f"📊 Loaded {len(rows)} rows from Google Sheet")
+        except Exception as e:
+            track_api_call_simple("sheets_song_read", success=False, error_message=str(e))
+            raise
         
         return self.cached_song_data[sheet_url]
     
+    def _parse_sheet_url(self, sheet_url):
+        """Extract (sheet_id, gid) from a sheet URL, parsing each URL only once"""
+        parsed = self._parsed_urls.get(sheet_url)
+        if parsed is None:
+            sheet_id_match = _SHEET_ID_RE.search(sheet_url)
+            if not sheet_id_match:
+                raise ValueError(f"Invalid sheet URL format: {sheet_url}")
+            
+            gid_match = _GID_RE.search(sheet_url)
+            parsed = (sheet_id_match.group(1), gid_match.group(1) if gid_match else "0")
+            self._parsed_urls[sheet_url] = parsed
+        return parsed
+    
+    def _get_sheet_version(self, sheet_id):
+        """Return the spreadsheet's Drive version number, or None if it can't be read"""
+        try:
+            if self.drive_service is None:
+                self.drive_service = get_drive_service()
+            if self.drive_service is None:
+                return None
+            
+            file_info = self._execute_with_backoff(
+                self.drive_service.files().get(
+                    fileId=sheet_id, fields="version", supportsAllDrives=True
+                )
+            )
+            track_api_call_simple("sheets_song_version", success=True)
+            return file_info.get('version')
+        except Exception as e:
+            track_api_call_simple("sheets_song_version", success=False, error_message=str(e))
+            logging.warning(f"⚠️ Could not check sheet version, skipping disk cache: {e}")
+            return None
+    
+    def _load_cached_rows(self, sheet_id, gid, version):
+        """Load rows saved for this sheet version, or None on a cache miss"""
+        if version is None:
+            return None
+        
+        cache_path = get_path_manager().get_cache_path(f"sheet_{sheet_id}_{gid}_{version}.json")
+        if not cache_path.exists():
+            return None
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring unreadable sheet cache {cache_path.name}: {e}")
+            return None
+    
+    def _save_cached_rows(self, sheet_id, gid, version, rows):
+        """Persist rows for this sheet version and drop older versions of the same tab"""
+        if version is None:
+            return
+        
+        try:
+            cache_dir = get_path_manager().get_cache_path()
+            cache_name = f"sheet_{sheet_id}_{gid}_{version}.json"
+            for old_path in cache_dir.glob(f"sheet_{sheet_id}_{gid}_*.json"):
+                if old_path.name != cache_name:
+                    old_path.unlink()
+            
+            with open(cache_dir / cache_name, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write sheet cache: {e}")
+    
+    def _load_parsed_sheet(self, sheet_url):
+        """Load sheet data and parse it once per load (cached for batch processing)"""
+        rows = self._load_sheet_data(sheet_url)
+        
+        parsed = self.cached_parsed_data.get(sheet_url)
+        if parsed is None:
+            songs, weeks = parse_sheet_rows(rows)
+            parsed = {'songs': songs, 'weeks': weeks}
+            self.cached_parsed_data[sheet_url] = parsed
+        
+        return parsed
+    
+    def _get_week_groups(self, parsed):
+        """Return (week_dict, week_dates) for parsed sheet data, computed once"""
+        if 'week_dict' not in parsed:
+            parsed['week_dict'], parsed['week_dates'] = group_songs_by_week(
+                parsed['songs'], parsed['weeks'])
+        return parsed['week_dict'], parsed['week_dates']
+    
     def generate_song_list_batch_optimized(self, sheet_url, output_filename, duration_in_seconds, 
                                          music_folder, output_folder, new_song_count=5, 
                                          export_song_list=True, export_timestamp=True):
@@ -113,12 +249,12 @@ class SongListGenerator:
             # Ensure connection (only connects once per batch)
             self._ensure_connection()
             
-            # Load sheet data (uses cache for subsequent calls)
-            rows = self._load_sheet_data(sheet_url)
+            # Load and parse sheet data (uses cache for subsequent calls)
+            parsed = self._load_parsed_sheet(sheet_url)
             
             # Call the existing generate_song_list_from_google_sheet logic
-            # but with pre-loaded rows instead of making API calls
-            return self._process_existing_data(rows, output_filename, duration_in_seconds, 
+            # but with pre-parsed rows instead of making API calls
+            return self._process_existing_data(parsed, output_filename, duration_in_seconds, 
                                              music_folder, output_folder, new_song_count, 
                                              export_song_list, export_timestamp)
             
@@ -127,35 +263,14 @@ class SongListGenerator:
             logging.error(f"❌ Failed to generate song list: {e}")
             return None
     
-    def _process_existing_data(self, rows, output_filename, duration_in_seconds, 
+    def _process_existing_data(self, parsed, output_filename, duration_in_seconds, 
                       music_folder, output_folder, new_song_count=5, 
                       export_song_list=True, export_timestamp=True):
         """Process pre-loaded song data - CLEANED UP VERSION"""
         
         logging.info(f"🎵 Processing {output_filename} - {duration_in_seconds}s duration, {new_song_count} new songs")
         
-        songs_raw = []
-        weeks_raw = []
-        last_week = ""
-        
-        # Parse song data from sheet rows
-        for i, row in enumerate(rows[1:], 2):  # Start from row 2 (skip header)
-            if len(row) < 2:
-                continue
-                
-            a = row[0].strip() if len(row) > 0 else ""
-            b = row[1].strip() if len(row) > 1 else ""
-            
-            if a.isdigit() and b:
-                song = f"{a}_{b}"
-                songs_raw.append(song)
-                
-                week = row[4].strip() if len(row) > 4 else ""
-                if not week and last_week:
-                    week = last_week
-                elif week:
-                    last_week = week
-                weeks_raw.append(week)
+        songs_raw, weeks_raw = parsed['songs'], parsed['weeks']
         
         logging.info(f"📊 Found {len(songs_raw)} valid songs from sheet")
         
@@ -163,24 +278,11 @@ class SongListGenerator:
             logging.error("❌ No valid data available to generate song list.")
             return None
 
-        # Process weeks and select songs
-        week_dict = {}
-        last_week = None
-        for i, song in enumerate(songs_raw):
-            song = song.strip()
-            if not song or song in ("-", "_"):
-                continue
-
-            week = weeks_raw[i] or last_week
-            if week:
-                last_week = week
-                week_dict.setdefault(week, []).append(song)
+        week_dict, week_dates = self._get_week_groups(parsed)
 
         logging.info(f"📅 Found {len(week_dict)} unique weeks")
 
-        sorted_weeks = sorted(week_dict.keys(), key=lambda x: datetime.strptime(x, "%d/%m/%Y"))
-        newest_week = sorted_weeks[-1]
-        old_weeks = sorted_weeks[:-1]
+        newest_week = max(week_dates, key=week_dates.__getitem__)
         
         logging.info(f"📆 Newest week: {newest_week} ({len(week_dict.get(newest_week, []))} songs)")
 
@@ -189,9 +291,8 @@ class SongListGenerator:
         missing_files = []
 
         # Select newest week songs
-        new_week_songs = week_dict.get(newest_week, []).copy()
-        random.shuffle(new_week_songs)
-        selected_songs += new_week_songs[:new_song_count]
+        new_week_songs = week_dict.get(newest_week, [])
+        selected_songs += random.sample(new_week_songs, k=max(0, min(new_song_count, len(new_week_songs))))  # UI count isn't range-checked
         used_songs.update(selected_songs)
         
         logging.info(f"🎵 Selected {len(selected_songs)} songs from newest week")
@@ -201,43 +302,51 @@ class SongListGenerator:
 
         # Fill up duration by checking song files and adding more if needed
         total_duration = 0
+        durations = {}  # song -> WAV duration, reused by the timestamp export
+        wav_index = scan_wav_files(music_folder) if music_folder else {}
         
         if duration_in_seconds and music_folder:
-            # Check selected songs and get their durations
-            for song in selected_songs:
-                song = unicodedata.normalize("NFC", song)
-                path = os.path.join(music_folder, f"{song}.wav")
-                
-                if not os.path.isfile(path):
+            # Check selected songs and get their durations (probed together)
+            for song, path, duration in _iter_probed_songs(selected_songs, wav_index,
+                                                           window=len(selected_songs)):
+                if path is None:
                     missing_files.append(f"{song}.wav")
                 else:
-                    duration = get_wav_duration(path)
+                    durations[song] = duration
                     total_duration += duration
 
             # Add more songs if needed
             if total_duration < duration_in_seconds:
                 logging.info(f"⏱️ Need more songs ({total_duration}s < {duration_in_seconds}s), adding from older weeks...")
-                old_song_pool = [s for w in reversed(old_weeks) for s in week_dict[w]]
-                random.shuffle(old_song_pool)
-
-                for song in old_song_pool:
-                    if song in used_songs:
-                        continue
-                        
-                    song_norm = unicodedata.normalize("NFC", song)
-                    path = os.path.join(music_folder, f"{song_norm}.wav")
+                # Unique unused songs from older weeks, drawn in random order only
+                # as far as the fill actually reads
+                old_song_pool = chain.from_iterable(
+                    songs for week, songs in week_dict.items() if week != newest_week)
+                candidates = _iter_shuffled(s for s in dict.fromkeys(old_song_pool) if s not in used_songs)
+
+                # Probe a window of candidates at once, then take the shortest prefix
+                # whose running duration covers the shortfall
+                while True:
+                    window = list(islice(candidates, _PROBE_WORKERS))
+                    if not window:
+                        break
+                    probed = list(_iter_probed_songs(window, wav_index, window=len(window)))
+                    running = list(accumulate(dur or 0 for _, _, dur in probed))
+                    take = bisect_left(running, duration_in_seconds - total_duration) + 1
                     
-                    if not os.path.isfile(path):
-                        missing_files.append(f"{song}.wav")
-                        continue
+                    for song, path, dur in probed[:take]:
+                        if path is None:
+                            missing_files.append(f"{song}.wav")
+                            continue
                         
-                    dur = get_wav_duration(path)
-                    if dur:
-                        selected_songs.append(song)
-                        used_songs.add(song)
-                        total_duration += dur
-                        if total_duration >= duration_in_seconds:
-                            break
+                        if dur:
+                            durations[song] = dur
+                            selected_songs.append(song)
+                            used_songs.add(song)
+                            total_duration += dur
+                    
+                    if total_duration >= duration_in_seconds:
+                        break
             
             logging.info(f"✅ Final selection: {len(selected_songs)} songs, {total_duration}s total")
 
@@ -245,62 +354,7 @@ class SongListGenerator:
             logging.error(f"❌ Missing {len(missing_files)} WAV files")
             return ("missing", sorted(set(missing_files)))
 
-        # Export song list
-        if export_song_list:
-            try:
-                with open(list_path, "w", encoding="utf-8") as f:
-                    for song in selected_songs:
-                        f.write(song + "\n")
-                logging.info("💾 Song list saved")
-            except Exception as e:
-                logging.error(f"❌ Failed to save song list: {e}")
-                return None
-
-        # Export timestamp files
-        if export_timestamp:
-            # Extract base name from output_filename, preserving any suffix
-            if output_filename.endswith("_song_list.txt"):
-                base_name = output_filename.replace("_song_list.txt", "")
-            else:
-                base_name = os.path.splitext(output_filename)[0].replace("_song_list", "")
-            
-            timestamp_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp.txt")
-            timestamp_full_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp_full.txt")
-
-            try:
-                with open(timestamp_path, "w", encoding="utf-8") as f_stripped, \
-                    open(timestamp_full_path, "w", encoding="utf-8") as f_full:
-
-                    current_time = 0
-                    for song in selected_songs:
-                        song = unicodedata.normalize("NFC", song)
-                        path = os.path.join(music_folder, f"{song}.wav")
-
-                        if not os.path.isfile(path):
-                            continue
-
-                        # Format timestamp
-                        timestamp = format_timestamp_from_seconds(current_time)
-                        
-                        # Split song name for clean titles
-                        if '_' in song:
-                            song_title_only = song.split('_', 1)[1]
-                        else:
-                            song_title_only = song
-                            
-                        f_stripped.write(f"{timestamp} {song_title_only}\n")
-                        f_full.write(f"{timestamp} {song}\n")
-                        
-                        # Get duration for next timestamp
-                        duration = get_wav_duration(path)
-                        current_time += duration
-                
-                logging.info("📝 Timestamp files created")
-                
-            except Exception as e:
-                logging.error(f"❌ Failed to create timestamp files: {e}")
-
-        # Create temp music file
+        # Derive output base name, preserving any suffix
         if output_filename.endswith("_song_list.txt"):
             base_name = output_filename.replace("_song_list.txt", "")
         else:
@@ -309,65 +363,90 @@ class SongListGenerator:
         concat_file_path = os.path.join(output_folder, f"{base_name}_music_concat.txt")
         temp_music_path = os.path.join(output_folder, f"{base_name}_temp_music.wav")
         
-        # Create concat file
-        try:
-            with open(concat_file_path, "w", encoding="utf-8") as f:
-                for song in selected_songs:
-                    song = unicodedata.normalize("NFC", song)
-                    wav_path = os.path.join(music_folder, f"{song}.wav")
-                    if os.path.isfile(wav_path):
-                        # Convert backslashes to forward slashes for FFmpeg
-                        ffmpeg_path = wav_path.replace('\\', '/')
-                        f.write(f"file '{ffmpeg_path}'\n")
-            
-            logging.info("📝 Concat file created")
+        # Resolve WAV paths once; probe any durations selection skipped (no target duration)
+        song_info = _build_song_info(selected_songs, wav_index)
+        if export_timestamp:
+            wav_paths = dict(song_info)
+            unprobed = [song for song in wav_paths if song not in durations]
+            durations.update(zip(unprobed, _probe_wav_durations([wav_paths[song] for song in unprobed])))
+        
+        # One pass over the selection builds the concat listing and both timestamp files
+        concat_lines = []
+        stripped_lines = []
+        full_lines = []
+        current_time = 0
+        for song, wav_path in song_info:
+            concat_lines.append(_concat_entry(wav_path))
             
-        except Exception as e:
-            logging.error(f"❌ Failed to create concat file: {e}")
-            return False
+            if export_timestamp:
+                timestamp = format_timestamp_from_seconds(current_time)
+                
+                # Split song name for clean titles
+                if '_' in song:
+                    song_title_only = song.split('_', 1)[1]
+                else:
+                    song_title_only = song
+                    
+                stripped_lines.append(f"{timestamp} {song_title_only}\n")
+                full_lines.append(f"{timestamp} {song}\n")
+                current_time += durations[song]
+        
+        # Concat listing as UTF-8 bytes for FFmpeg's stdin
+        concat_listing = "".join(concat_lines).encode("utf-8")
+        if KEEP_CONCAT_FILES:
+            try:
+                _write_concat_file(concat_file_path, concat_listing)
+            except Exception as e:
+                logging.error(f"❌ Failed to create concat file: {e}")
+                return False
 
-        # Create temp music file with FFmpeg
+        # Start creating the temp music file with FFmpeg in the background,
+        # so it overlaps the text-file writes below
         try:
-            # Import and use proper FFmpeg detection
-            
-            ffmpeg_path = find_executable("ffmpeg")
-            if not ffmpeg_path:
-                logging.error("❌ FFmpeg not found for temp music creation")
-                return False
-            
-            extra_args = {}
-            if sys.platform == "win32":
-                extra_args["creationflags"] = 0x08000000
-
-            ffmpeg_cmd = [
-                ffmpeg_path, "-y", "-f", "concat", "-safe", "0", 
-                "-i", concat_file_path, "-c", "copy", temp_music_path
-            ]
-            
-            logging.info(f"🎵 Creating temp music using: {ffmpeg_path}")
-            
-            result = subprocess.run(
-                ffmpeg_cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                text=True,
-                **extra_args
-            )
-            
-            if result.returncode != 0:
-                logging.error(f"❌ FFmpeg failed: {result.stderr}")
-                return False
-            
-            if not os.path.exists(temp_music_path):
-                logging.error(f"❌ Temp music file was not created")
-                return False
-            else:
-                file_size = os.path.getsize(temp_music_path)
-                logging.info(f"🎵 Temp music created: {file_size // (1024*1024)}MB")
-                
+            ffmpeg_proc = _start_ffmpeg_concat(concat_listing, temp_music_path)
         except Exception as e:
             logging.error(f"❌ Exception creating temp music: {e}")
             return False
+        
+        if ffmpeg_proc is None:
+            return False
+
+        try:
+            # Export song list
+            if export_song_list:
+                try:
+                    with open(list_path, "w", encoding="utf-8") as f:
+                        f.write("".join(f"{song}\n" for song in selected_songs))
+                    logging.info("💾 Song list saved")
+                except Exception as e:
+                    logging.error(f"❌ Failed to save song list: {e}")
+                    return None
+
+            # Export timestamp files
+            if export_timestamp:
+                timestamp_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp.txt")
+                timestamp_full_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp_full.txt")
+
+                try:
+                    with open(timestamp_path, "w", encoding="utf-8") as f_stripped, \
+                        open(timestamp_full_path, "w", encoding="utf-8") as f_full:
+                        f_stripped.write("".join(stripped_lines))
+                        f_full.write("".join(full_lines))
+                    
+                    logging.info("📝 Timestamp files created")
+                    
+                except Exception as e:
+                    logging.error(f"❌ Failed to create timestamp files: {e}")
+
+            # Wait for FFmpeg to finish the temp music file
+            try:
+                if not _finish_ffmpeg_concat(ffmpeg_proc, temp_music_path):
+                    return False
+            except Exception as e:
+                logging.error(f"❌ Exception creating temp music: {e}")
+                return False
+        finally:
+            _stop_process(ffmpeg_proc)
 
         # Success!
         track_api_call_simple("song_list_generation_batch", success=True, 
@@ -389,45 +468,26 @@ def generate_distributed_song_lists(sheet_url, distribution_settings, duration_i
         
         # Use the batch generator to load songs efficiently
         _batch_generator._ensure_connection()
-        rows = _batch_generator._load_sheet_data(sheet_url)
-        
-        # Parse all songs
-        all_songs = []
-        all_weeks = []
-        last_week = ""
-        
-        for row in rows[1:]:  # Skip header
-            if len(row) < 2:
-                continue
-                
-            a = row[0].strip() if len(row) > 0 else ""
-            b = row[1].strip() if len(row) > 1 else ""
-            
-            if a.isdigit() and b:
-                song = f"{a}_{b}"
-                all_songs.append(song)
-                
-                week = row[4].strip() if len(row) > 4 else ""
-                if not week and last_week:
-                    week = last_week
-                elif week:
-                    last_week = week
-                all_weeks.append(week)
+        parsed = _batch_generator._load_parsed_sheet(sheet_url)
+        all_songs, all_weeks = parsed['songs'], parsed['weeks']
         
         logging.info(f"📊 Loaded {len(all_songs)} songs for distribution")
         
         # Shuffle if random distribution
         if distribution_method == "random":
-            import random
-            song_week_pairs = list(zip(all_songs, all_weeks))
-            random.shuffle(song_week_pairs)
-            all_songs, all_weeks = zip(*song_week_pairs)
-            all_songs = list(all_songs)
-            all_weeks = list(all_weeks)
+            # Permute indices once and apply to both lists (cached lists stay untouched)
+            order = list(range(len(all_songs)))
+            random.shuffle(order)
+            all_songs = [all_songs[i] for i in order]
+            all_weeks = [all_weeks[i] for i in order]
+        
+        # One directory read instead of a stat per song
+        wav_index = scan_wav_files(music_folder)
         
         # Generate song lists for each video
         video_song_lists = []
         concat_files_to_cleanup = []
+        render_jobs = []  # FFmpeg work per video, run concurrently once all lists are written
         
         for i, (start_idx, end_idx, count) in enumerate(song_ranges):
             video_num = i + 1
@@ -441,97 +501,86 @@ def generate_distributed_song_lists(sheet_url, distribution_settings, duration_i
             base_name = f"Part{video_num}"
             output_filename = f"{base_name}_song_list.txt"
             
-            # Create song list by repeating the chunk to fill duration
-            selected_songs = []
-            total_duration = 0
-            
             # Check for missing WAV files first
             missing_files = []
             for song in video_songs:
-                song_normalized = unicodedata.normalize("NFC", song)
-                wav_path = os.path.join(music_folder, f"{song_normalized}.wav")
-                if not os.path.isfile(wav_path):
+                if _wav_key(song) not in wav_index:
                     missing_files.append(f"{song}.wav")
             
             if missing_files:
                 logging.warning(f"Video {video_num}: Missing {len(missing_files)} WAV files")
                 return ("missing", missing_files)
             
-            # Fill duration by repeating the video's songs
-            song_index = 0
-            while total_duration < duration_in_seconds:
-                song = video_songs[song_index % len(video_songs)]
-                song_normalized = unicodedata.normalize("NFC", song)
-                wav_path = os.path.join(music_folder, f"{song_normalized}.wav")
-                
-                duration = get_wav_duration(wav_path)
-                if duration > 0:
-                    selected_songs.append(song)
-                    total_duration += duration
-                
-                song_index += 1
+            # Probe each song in the chunk once, concurrently
+            unique_songs = list(dict.fromkeys(video_songs))
+            wav_paths = [wav_index[_wav_key(song)] for song in unique_songs]
+            durations = dict(zip(unique_songs, _probe_wav_durations(wav_paths)))  # song -> WAV duration
             
-            # Save song list
-            list_path = os.path.join(output_folder, output_filename)
-            with open(list_path, "w", encoding="utf-8") as f:
-                for song in selected_songs:
-                    f.write(song + "\n")
+            playable_songs = [song for song in video_songs if durations[song] > 0]
+            chunk_duration = sum(durations[song] for song in playable_songs)
+            if chunk_duration <= 0:
+                logging.error(f"Video {video_num}: no playable songs to fill duration")
+                return None
             
-            # Create timestamp file if requested
-            timestamp_path = None
-            if export_timestamp:
-                timestamp_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp.txt")
-                with open(timestamp_path, "w", encoding="utf-8") as f:
-                    current_time = 0
-                    for song in selected_songs:
-                        song_normalized = unicodedata.normalize("NFC", song)
-                        wav_path = os.path.join(music_folder, f"{song_normalized}.wav")
-                        
-                        timestamp = format_timestamp_from_seconds(current_time)
-                        f.write(f"{timestamp} {song.split('_', 1)[-1]}\n")
-                        
-                        current_time += get_wav_duration(wav_path)
+            # Fill duration by repeating the video's songs: whole chunks first, then a partial tail
+            full_repeats = int(duration_in_seconds // chunk_duration)
+            selected_songs = playable_songs * full_repeats
+            total_duration = chunk_duration * full_repeats
+            for song in playable_songs:
+                if total_duration >= duration_in_seconds:
+                    break
+                selected_songs.append(song)
+                total_duration += durations[song]
             
-            # Create temp_music.wav for this video
+            # Build the concat listing now; FFmpeg runs for all videos together afterwards
             concat_file_path = os.path.join(output_folder, f"{base_name}_music_concat.txt")
             concat_files_to_cleanup.append(concat_file_path)
 
-            with open(concat_file_path, "w", encoding="utf-8") as f:
-                for song in selected_songs:
-                    song_normalized = unicodedata.normalize("NFC", song)
-                    wav_path = os.path.join(music_folder, f"{song_normalized}.wav")
-                    f.write(f"file '{wav_path.replace('\\', '/')}'\n")
+            # With several repeats, render the chunk once and list it instead of every song again
+            chunk_music_path = None
+            chunk_listing = None
+            if full_repeats >= 2:
+                chunk_music_path = os.path.join(output_folder, f"{base_name}_chunk_music.wav")
+                chunk_listing = _build_concat_listing(_build_song_info(playable_songs, wav_index))
+                chunk_entry = os.path.abspath(chunk_music_path).replace(os.sep, '/')
+                tail_songs = selected_songs[len(playable_songs) * full_repeats:]
+                concat_listing = (_concat_entry(chunk_entry) * full_repeats).encode("utf-8") + \
+                    _build_concat_listing(_build_song_info(tail_songs, wav_index))
+            else:
+                concat_listing = _build_concat_listing(_build_song_info(selected_songs, wav_index))
+            
+            if KEEP_CONCAT_FILES:
+                _write_concat_file(concat_file_path, concat_listing)
             
-            # Generate temp music file
             temp_music_path = os.path.join(output_folder, f"{base_name}_temp_music.wav")
+            render_jobs.append({
+                'video_num': video_num,
+                'chunk_listing': chunk_listing,
+                'chunk_music_path': chunk_music_path,
+                'repeats': full_repeats,
+                'concat_listing': concat_listing,
+                'temp_music_path': temp_music_path
+            })
 
-            ffmpeg_path = find_executable("ffmpeg")
-            if not ffmpeg_path:
-                logging.error(f"❌ FFmpeg not found for distributed temp music creation (video {video_num})")
-                return False
-
-            extra_args = {}
-            if sys.platform == "win32":
-                extra_args["creationflags"] = 0x08000000
-
-            ffmpeg_cmd = [
-                ffmpeg_path, "-y", "-f", "concat", "-safe", "0",
-                "-i", concat_file_path, "-c", "copy", temp_music_path
-            ]
-
-            logging.info(f"🎵 Creating distributed temp music for video {video_num} using: {ffmpeg_path}")
-            
-            result = subprocess.run(
-                ffmpeg_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                **extra_args
-            )
+            # Save song list
+            list_path = os.path.join(output_folder, output_filename)
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{song}\n" for song in selected_songs))
             
-            if result.returncode != 0 or not os.path.exists(temp_music_path):
-                logging.error(f"Failed to create temp music for video {video_num}")
-                return False
+            # Create timestamp file if requested
+            timestamp_path = None
+            if export_timestamp:
+                timestamp_path = os.path.join(output_folder, f"{base_name}_song_list_timestamp.txt")
+                timestamp_lines = []
+                current_time = 0
+                for song in selected_songs:
+                    timestamp = format_timestamp_from_seconds(current_time)
+                    timestamp_lines.append(f"{timestamp} {song.split('_', 1)[-1]}\n")
+                    
+                    current_time += durations[song]
+                
+                with open(timestamp_path, "w", encoding="utf-8") as f:
+                    f.write("".join(timestamp_lines))
             
             # Store info for this video - ADDED cleanup info
             video_song_lists.append({
@@ -545,6 +594,13 @@ def generate_distributed_song_lists(sheet_url, distribution_settings, duration_i
                 'base_name': base_name
             })
         
+        # Stream-copy concats are I/O bound, so several videos can render at once
+        if render_jobs:
+            with ThreadPoolExecutor(max_workers=min(_CONCAT_WORKERS, len(render_jobs))) as executor:
+                results = list(executor.map(_render_distributed_music, render_jobs))
+            if not all(results):
+                return False
+        
         # ADDED: Store cleanup list in the return data
         for video_info in video_song_lists:
             video_info['_concat_files_to_cleanup'] = concat_files_to_cleanup
@@ -568,6 +624,313 @@ def generate_song_list_for_batch(sheet_url, output_filename, duration_in_seconds
         output_folder, new_song_count, export_song_list, export_timestamp
     )
 
+def _build_concat_listing(song_info):
+    """Build the FFmpeg concat demuxer listing (UTF-8 bytes) for the given song info"""
+    return "".join(_concat_entry(wav_path) for _, wav_path in song_info).encode("utf-8")
+
+def _concat_entry(wav_path):
+    """Format one concat demuxer line, escaping single quotes in the path"""
+    return "file '" + wav_path.replace("'", "'\\''") + "'\n"
+
+def _write_concat_file(concat_file_path, concat_listing):
+    """Write the concat listing to disk for debugging (MP4_LOOPER_KEEP_CONCAT=1)"""
+    with open(concat_file_path, "wb") as f:
+        f.write(concat_listing)
+    logging.info(f"📝 Concat file created: {concat_file_path}")
+
+def parse_sheet_rows(rows):
+    """Parse sheet rows (header first) into parallel song and week lists.
+
+    A song is "<id>_<title>" from columns A and B, kept only when A is numeric
+    and B is non-empty, and is returned NFC-normalized. The week comes from
+    column E; blank cells inherit the last week seen above them.
+    """
+    songs = []
+    weeks = []
+    last_week = ""
+    
+    for row in rows[1:]:  # Skip header
+        if len(row) < 2:
+            continue
+        
+        # Reject non-song rows (headers, notes, blanks) before any string copies
+        id_match = _SONG_ID_RE.match(row[0])
+        if not id_match:
+            continue
+        if len(row) < 5:
+            row = row + [""] * (5 - len(row))
+        
+        _, b, _, _, week = row[:5]
+        b = b.strip()
+        
+        if b:
+            # NFC once here so names match scan_wav_files keys everywhere downstream
+            songs.append(unicodedata.normalize("NFC", f"{id_match.group(1)}_{b}"))
+            
+            week = week.strip()
+            if not week and last_week:
+                week = last_week
+            elif week:
+                last_week = week
+            weeks.append(week)
+    
+    return songs, weeks
+
+def cached_wav_duration(wav_path):
+    """WAV duration memoized by path and modification time.
+
+    The RIFF header is read directly when possible, falling back to
+    get_wav_duration (FFprobe) otherwise. Only successful probes are cached,
+    so a file that failed to probe (or FFprobe being unavailable) is retried
+    on the next call.
+    """
+    try:
+        key = (wav_path, os.path.getmtime(wav_path))
+    except OSError as e:
+        logging.error(f"❌ File not found: {wav_path} ({e})")
+        return 0
+    
+    duration = _wav_duration_cache.get(key)
+    if duration is None:
+        duration = _wav_header_duration(wav_path) or get_wav_duration(wav_path)
+        if duration > 0:
+            _wav_duration_cache[key] = duration
+    return duration
+
+def _wav_header_duration(wav_path):
+    """Read a WAV's duration from its RIFF header (data size / byte rate).
+
+    Walks the chunk list so LIST/bext chunks before 'data' are handled. Returns
+    None for anything it can't parse (RF64, streamed sizes, truncated headers)
+    so the caller can fall back to FFprobe.
+    """
+    try:
+        with open(wav_path, 'rb') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+                return None
+            
+            byte_rate = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                chunk_id, chunk_size = header[:4], struct.unpack('<I', header[4:])[0]
+                
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size + (chunk_size & 1))
+                    if len(fmt) < 12:
+                        return None
+                    byte_rate = struct.unpack('<I', fmt[8:12])[0]
+                elif chunk_id == b'data':
+                    if not byte_rate or chunk_size == 0xFFFFFFFF:
+                        return None
+                    return chunk_size / byte_rate
+                else:
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)  # chunks are word-aligned
+    except (OSError, struct.error):
+        return None
+
+def group_songs_by_week(songs, weeks):
+    """Group parsed songs by week label.
+
+    Returns (week_dict, week_dates) where week_dict maps each DD/MM/YYYY week
+    to its songs and week_dates maps each week to its parsed datetime.
+    """
+    week_dict = {}
+    last_week = None
+    for i, song in enumerate(songs):
+        song = song.strip()
+        if not song or song in ("-", "_"):
+            continue
+
+        week = weeks[i] or last_week
+        if week:
+            last_week = week
+            week_dict.setdefault(week, []).append(song)
+
+    # Parse each DD/MM/YYYY week label once; callers pick/sort by these dates
+    week_dates = {}
+    for week in week_dict:
+        day, month, year = week.split('/')
+        week_dates[week] = datetime(int(year), int(month), int(day))
+    
+    return week_dict, week_dates
+
+def _probe_wav_durations(wav_paths):
+    """Return cached_wav_duration for each path, probing up to _PROBE_WORKERS files at once"""
+    if not wav_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(_PROBE_WORKERS, len(wav_paths))) as executor:
+        return list(executor.map(cached_wav_duration, wav_paths))
+
+def _iter_shuffled(items):
+    """Yield items in random order, shuffling only as far as the caller reads"""
+    items = list(items)
+    for i in range(len(items) - 1, -1, -1):
+        j = random.randrange(i + 1)
+        items[i], items[j] = items[j], items[i]
+        yield items[i]
+
+def _iter_probed_songs(songs, wav_index, window=_PROBE_WORKERS):
+    """Yield (song, wav_path, duration) for songs in order.
+
+    Durations are probed concurrently, window songs at a time, so a caller that
+    stops early wastes at most one window of probes. wav_path and duration are
+    None for songs missing from wav_index.
+    """
+    window = max(window, 1)
+    for start in range(0, len(songs), window):
+        batch = songs[start:start + window]
+        paths = [wav_index.get(_wav_key(song)) for song in batch]
+        probed = iter(_probe_wav_durations([path for path in paths if path is not None]))
+        for song, path in zip(batch, paths):
+            yield song, path, (next(probed) if path is not None else None)
+
+def _start_ffmpeg_concat(concat_listing, temp_music_path):
+    """Launch FFmpeg concat fed from stdin without waiting for it to finish.
+
+    Returns the process, or None if FFmpeg is missing. The whole listing is
+    written up front and stdin closed, since the concat demuxer reads it to EOF
+    before producing output.
+    """
+    ffmpeg_path = find_executable("ffmpeg")
+    if not ffmpeg_path:
+        logging.error("❌ FFmpeg not found for temp music creation")
+        return None
+    
+    extra_args = {}
+    if sys.platform == "win32":
+        extra_args["creationflags"] = 0x08000000
+
+    ffmpeg_cmd = [
+        ffmpeg_path, "-y", "-f", "concat", "-safe", "0",
+        "-protocol_whitelist", "file,pipe",
+        "-i", "pipe:0", "-c", "copy", temp_music_path
+    ]
+    
+    logging.info(f"🎵 Creating temp music using: {ffmpeg_path}")
+    
+    # stdout is unused (output goes to temp_music_path); only stderr is drained
+    proc = subprocess.Popen(
+        ffmpeg_cmd, 
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL, 
+        stderr=subprocess.PIPE, 
+        **extra_args
+    )
+    
+    try:
+        proc.stdin.write(concat_listing)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass  # FFmpeg exited early; _finish_ffmpeg_concat reports its stderr
+    
+    return proc
+
+def _finish_ffmpeg_concat(proc, temp_music_path):
+    """Wait for a concat started by _start_ffmpeg_concat and verify the output file"""
+    stderr = proc.stderr.read()
+    proc.wait()
+    
+    if proc.returncode != 0:
+        logging.error(f"❌ FFmpeg failed: {stderr.decode('utf-8', errors='replace')}")
+        return False
+    
+    if not os.path.exists(temp_music_path):
+        logging.error(f"❌ Temp music file was not created")
+        return False
+    
+    file_size = os.path.getsize(temp_music_path)
+    logging.info(f"🎵 Temp music created: {file_size // (1024*1024)}MB")
+    return True
+
+def _run_ffmpeg_concat(concat_listing, output_path):
+    """Run an FFmpeg concat to completion; returns True if output_path was created"""
+    proc = _start_ffmpeg_concat(concat_listing, output_path)
+    if proc is None:
+        return False
+    
+    try:
+        return _finish_ffmpeg_concat(proc, output_path)
+    finally:
+        _stop_process(proc)
+
+def _render_distributed_music(job):
+    """Render one distributed video's temp music, first rendering its repeated chunk if any"""
+    video_num = job['video_num']
+    try:
+        if job['chunk_listing'] is not None:
+            logging.info(f"🎵 Rendering repeated chunk for video {video_num} ({job['repeats']}x)")
+            if not _run_ffmpeg_concat(job['chunk_listing'], job['chunk_music_path']):
+                logging.error(f"Failed to create chunk music for video {video_num}")
+                return False
+        
+        logging.info(f"🎵 Creating distributed temp music for video {video_num}")
+        if not _run_ffmpeg_concat(job['concat_listing'], job['temp_music_path']):
+            logging.error(f"Failed to create temp music for video {video_num}")
+            return False
+        return True
+    finally:
+        _remove_temp_file(job['chunk_music_path'])
+
+def _remove_temp_file(path):
+    """Delete an intermediate file if it exists, logging rather than raising on failure"""
+    if not path:
+        return
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not remove temp file {path}: {e}")
+
+def _stop_process(proc):
+    """Kill a background process that is still running (e.g. after an early return)"""
+    if proc.poll() is None:
+        proc.kill()
+        proc.wait()
+
+def _build_song_info(songs, wav_index):
+    """Return (song, wav_path) for each song present in wav_index.
+
+    Paths are converted to forward slashes once per unique song, which both
+    FFmpeg's concat demuxer (reading from a pipe) and FFprobe accept.
+    """
+    song_info = []
+    path_cache = {}
+    for song in songs:
+        if song in path_cache:
+            wav_path = path_cache[song]
+        else:
+            wav_path = wav_index.get(_wav_key(song))
+            if wav_path is not None:
+                wav_path = wav_path.replace(os.sep, '/')
+            path_cache[song] = wav_path
+        if wav_path is not None:
+            song_info.append((song, wav_path))
+    return song_info
+
+def _wav_key(song):
+    """Key used to look an NFC song name up in a scan_wav_files index"""
+    return os.path.normcase(f"{song}.wav")
+
+def scan_wav_files(music_folder):
+    """Index the .wav files in music_folder from a single directory read.
+
+    Returns a dict mapping each NFC-normalized, os.path.normcase'd file name
+    (so lookups match os.path.isfile, case-insensitive on Windows) to its
+    absolute path.
+    """
+    music_folder = os.path.abspath(music_folder)
+    try:
+        with os.scandir(music_folder) as entries:
+            return {os.path.normcase(unicodedata.normalize("NFC", e.name)): e.path
+                    for e in entries
+                    if e.name.lower().endswith(".wav") and e.is_file()}
+    except OSError as e:
+        logging.warning(f"⚠️ Could not scan music folder {music_folder}: {e}")
+        return {}
+
 def format_timestamp_from_seconds(total_seconds):
     """Convert total seconds to HH:MM:SS format"""
     hours = int(total_seconds // 3600)
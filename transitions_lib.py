@@ -1,24 +1,35 @@
+import sys
+import subprocess
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+
+from ffmpeg_utils import find_executable
 
 # TRANSITION FUNCTIONS
+@lru_cache(maxsize=32)
+def _alphas(n, reverse=False):
+    # Progress 0..1 per frame (1..0 if reverse), shared read-only across calls
+    alphas = np.linspace(0, 1, n)
+    if reverse:
+        alphas = 1 - alphas
+    alphas.flags.writeable = False
+    return alphas
+
 def fade(seq, reverse=False):
-    result = []
-    for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        blended = (
-            cv2.addWeighted(f, 1 - alpha, np.zeros_like(f), alpha, 0)
-            if reverse else
-            cv2.addWeighted(np.zeros_like(f), 1 - alpha, f, alpha, 0)
-        )
-        result.append(blended)
-    return result
+    # Blending against black is just scaling the frame, so no zero frame is needed
+    alphas = _alphas(len(seq), reverse)
+    return [cv2.convertScaleAbs(f, alpha=float(alpha)) for f, alpha in zip(seq, alphas)]
 
 def slide(seq, direction="left", reverse=False):
     height, width = seq[0].shape[:2]
+    alphas = _alphas(len(seq))
     result = []
     for i, f in enumerate(seq):
-        alpha = i / (len(seq) - 1)
+        alpha = alphas[i]
         shift = int(width * (1 - alpha)) if not reverse else int(width * alpha)
         canvas = np.zeros_like(f)
         if direction == "left":
@@ -36,11 +47,10 @@ def slide(seq, direction="left", reverse=False):
 
 def zoom(seq, intro=True):
     height, width = seq[0].shape[:2]
+    alphas = _alphas(len(seq), not intro)
     result = []
     for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        if not intro:
-            alpha = 1 - alpha
+        alpha = alphas[i]
         scale = 0.01 + 0.99 * alpha
         resized = cv2.resize(f, None, fx=scale, fy=scale)
         canvas = np.zeros_like(f)
@@ -52,9 +62,10 @@ def zoom(seq, intro=True):
 
 def wipe(seq, direction="down", reverse=False):
     height, width = seq[0].shape[:2]
+    alphas = _alphas(len(seq))
     result = []
     for i, f in enumerate(seq):
-        offset = int(height * (i / (len(seq)-1)))
+        offset = int(height * alphas[i])
         if reverse:
             offset = height - offset
         canvas = np.zeros_like(f)
@@ -67,101 +78,172 @@ def wipe(seq, direction="down", reverse=False):
 
 def blinds(seq, reverse=False):
     height, width = seq[0].shape[:2]
-    result = []
+    alphas = _alphas(len(seq), reverse)
     strips = 10
+    # Each row's offset within its strip and that strip's height, computed once
+    row_offset = np.empty(height, dtype=np.intp)
+    row_block_h = np.empty(height, dtype=np.intp)
+    for s in range(strips):
+        y0 = int((s / strips) * height)
+        y1 = int(((s + 1) / strips) * height)
+        row_offset[y0:y1] = np.arange(y1 - y0)
+        row_block_h[y0:y1] = y1 - y0
+    result = []
     for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        if reverse: alpha = 1 - alpha
-        canvas = np.zeros_like(f)
-        for s in range(strips):
-            y0 = int((s / strips) * height)
-            y1 = int(((s + 1) / strips) * height)
-            block_h = y1 - y0
-            h = int(block_h * alpha)
-            canvas[y0:y0+h, :] = f[y0:y0+h, :]
-        result.append(canvas)
+        alpha = alphas[i]
+        # Show the first int(block_h * alpha) rows of every strip
+        mask = row_offset < (row_block_h * alpha).astype(np.intp)
+        result.append(f * mask[:, None, None])
     return result
 
 def pixelate(seq, reverse=False):
     height, width = seq[0].shape[:2]
+    block_sizes = [int(40 * (1 - alpha) + 1) for alpha in _alphas(len(seq), reverse)]
     result = []
-    for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        if reverse: alpha = 1 - alpha
-        block_size = int(40 * (1 - alpha) + 1)
-        small = cv2.resize(f, (width//block_size, height//block_size))
+    start = 0
+    for block_size, group in groupby(block_sizes):
+        count = sum(1 for _ in group)
+        frames = seq[start:start + count]
+        start += count
+        if block_size == 1:
+            result.extend(frames)  # already full resolution
+            continue
+        # Frames sharing a block size are stacked along the channel axis and
+        # resized together; channels never mix, so each frame is unchanged
+        stacked = np.concatenate(frames, axis=2) if count > 1 else frames[0]
+        small = cv2.resize(stacked, (width//block_size, height//block_size))
         pixelated = cv2.resize(small, (width, height), interpolation=cv2.INTER_NEAREST)
-        result.append(pixelated)
+        result.extend(np.split(pixelated, count, axis=2))
     return result
 
 def dissolve(seq, reverse=False):
     height, width = seq[0].shape[:2]
+    rng = np.random.default_rng()
+    noise = np.empty((height, width, 1), dtype=np.float32)  # refilled in place per frame
+    alphas = _alphas(len(seq), reverse)
     result = []
     for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        if reverse: alpha = 1 - alpha
-        noise = (np.random.rand(height, width) < alpha).astype(np.uint8)
-        mask = np.stack([noise]*3, axis=2)
-        result.append((f * mask).astype(np.uint8))
+        alpha = alphas[i]
+        rng.random(dtype=np.float32, out=noise)
+        # Single-channel mask broadcasts across BGR; uint8 * bool stays uint8
+        mask = noise < alpha
+        result.append(f * mask)
     return result
 
 def expand_line(seq, reverse=False):
     height, width = seq[0].shape[:2]
+    alphas = _alphas(len(seq), reverse)
     result = []
     for i, f in enumerate(seq):
-        alpha = i / (len(seq)-1)
-        if reverse: alpha = 1 - alpha
+        alpha = alphas[i]
         half_h = int((height * alpha) // 2)
         center = height // 2
-        canvas = np.zeros_like(f)
-        canvas[center - half_h:center + half_h, :] = f[center - half_h:center + half_h, :]
-        result.append(canvas)
+        mask = np.zeros(height, dtype=bool)
+        mask[center - half_h:center + half_h] = True
+        result.append(f * mask[:, None, None])
     return result
 
 # SAVE FUNCTION
-def save_video(frames, path, fps):
-    height, width = frames[0].shape[:2]
-    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
-    for f in frames:
-        out.write(f)
-    out.release()
+class FFmpegWriter:
+    # Pipes raw BGR frames into one FFmpeg process; same write()/release() as cv2.VideoWriter
+    def __init__(self, path, fps, width, height):
+        ffmpeg_path = find_executable("ffmpeg")
+        if not ffmpeg_path:
+            raise RuntimeError("FFmpeg not found for transition encoding")
+
+        extra_args = {}
+        if sys.platform == "win32":
+            extra_args["creationflags"] = 0x08000000  # CREATE_NO_WINDOW
+
+        # -loglevel error keeps stderr small enough that the unread pipe never fills
+        self.proc = subprocess.Popen([
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            "-c:v", "h264_nvenc", "-preset", "fast", "-pix_fmt", "yuv420p",
+            path
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **extra_args)
+
+    def write(self, frame):
+        self.proc.stdin.write(np.ascontiguousarray(frame))
+
+    def release(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = self.proc.stderr.read()
+        self.proc.wait()
+        if self.proc.returncode != 0:
+            raise RuntimeError(f"FFmpeg transition encode failed: {stderr.decode('utf-8', errors='replace').strip()}")
 
 # MAIN ENTRY POINT
+# Transition registry: name -> (function, intro kwargs, outro kwargs)
+_TRANSITIONS = {
+    "fade": (fade, {}, {"reverse": True}),
+    "slide_left": (slide, {"direction": "left"}, {"direction": "left", "reverse": True}),
+    "slide_right": (slide, {"direction": "right"}, {"direction": "right", "reverse": True}),
+    "zoom": (zoom, {"intro": True}, {"intro": False}),
+    "wipe_down": (wipe, {"direction": "down"}, {"direction": "down", "reverse": True}),
+    "wipe_up": (wipe, {"direction": "up"}, {"direction": "up", "reverse": True}),
+    "blinds": (blinds, {}, {"reverse": True}),
+    "pixelate": (pixelate, {}, {"reverse": True}),
+    "dissolve": (dissolve, {}, {"reverse": True}),
+    "expand_line": (expand_line, {}, {"reverse": True}),
+}
+
 def process_video(input_path, output_path, transition_name, transition_duration=1.5):
-    cap = cv2.VideoCapture(input_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    transition_frames = int(fps * transition_duration)
-
-    frames = []
-    while True:
-        ret, f = cap.read()
-        if not ret:
-            break
-        frames.append(f)
-    cap.release()
-
-    intro = frames[:transition_frames]
-    middle = frames[transition_frames:-transition_frames]
-    outro = frames[-transition_frames:]
-
-    # Transition registry
-    trans_funcs = {
-        "fade": lambda: (fade(intro), fade(outro, True)),
-        "slide_left": lambda: (slide(intro, "left"), slide(outro, "left", True)),
-        "slide_right": lambda: (slide(intro, "right"), slide(outro, "right", True)),
-        "zoom": lambda: (zoom(intro, True), zoom(outro, False)),
-        "wipe_down": lambda: (wipe(intro, "down"), wipe(outro, "down", True)),
-        "wipe_up": lambda: (wipe(intro, "up"), wipe(outro, "up", True)),
-        "blinds": lambda: (blinds(intro), blinds(outro, True)),
-        "pixelate": lambda: (pixelate(intro), pixelate(outro, True)),
-        "dissolve": lambda: (dissolve(intro), dissolve(outro, True)),
-        "expand_line": lambda: (expand_line(intro), expand_line(outro, True)),
-    }
-
-    if transition_name not in trans_funcs:
+    if transition_name not in _TRANSITIONS:
         raise ValueError(f"Unknown transition: {transition_name}")
+    trans_func, intro_kwargs, outro_kwargs = _TRANSITIONS[transition_name]
+
+    cap = cv2.VideoCapture(input_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        transition_frames = int(fps * transition_duration)
+
+        intro = []
+        while len(intro) < transition_frames:
+            ret, f = cap.read()
+            if not ret:
+                break
+            intro.append(f)
+        if not intro:
+            raise ValueError(f"No frames read from {input_path}")
+
+        height, width = intro[0].shape[:2]
+        out = FFmpegWriter(output_path, fps, width, height)
+        try:
+            # The intro renders on a worker (NumPy/OpenCV release the GIL) while
+            # the next transition_frames are decoded; it is written before the
+            # first middle frame
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                intro_future = executor.submit(trans_func, intro, **intro_kwargs)
+                del intro
+
+                # Middle frames stream straight through; only the last
+                # transition_frames are held back as the outro
+                outro = deque(maxlen=transition_frames)
+                while True:
+                    ret, f = cap.read()
+                    if not ret:
+                        break
+                    if len(outro) == transition_frames:
+                        if intro_future is not None:
+                            for frame in intro_future.result():
+                                out.write(frame)
+                            intro_future = None
+                        out.write(outro.popleft())
+                    outro.append(f)
+
+                if intro_future is not None:
+                    for frame in intro_future.result():
+                        out.write(frame)
 
-    intro_frames, outro_frames = trans_funcs[transition_name]()
-    full = intro_frames + middle + outro_frames
-    save_video(full, output_path, fps)
+            if outro:
+                for f in trans_func(list(outro), **outro_kwargs):
+                    out.write(f)
+        finally:
+            out.release()
+    finally:
+        cap.release()
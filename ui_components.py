@@ -88,6 +88,7 @@ import logging
 import re
 import tkinter as tk
 import customtkinter as ctk
+from functools import lru_cache
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
 from tkinterdnd2 import TkinterDnD, DND_FILES
@@ -102,6 +103,21 @@ from settings_manager import get_settings
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
+@lru_cache(maxsize=512)
+def _fmt_duration(seconds):
+    """Duration label text like "(1h 30m)" - cached, the +/- buttons revisit the same values"""
+    h, m, s = format_duration(seconds)  # Use utils version
+    
+    display_text = ""
+    if h > 0:
+        display_text += f"{h}h "
+    if m > 0 or (h > 0 and s > 0):
+        display_text += f"{m}m "
+    if s > 0 or (h == 0 and m == 0):
+        display_text += f"{s}s"
+    
+    return f"({display_text.strip()})"
+
 class BatchProcessorUI(TkinterDnD.Tk):
     def __init__(self, app_controller):
         super().__init__()
@@ -121,9 +137,21 @@ class BatchProcessorUI(TkinterDnD.Tk):
         self.rendering = False
         self.was_stopped = False
         self.current_file_index = -1
-        self.folder_labels = []
-        self.output_preview_labels = []
         self.selected_file = None
+        self.processing_finished = False  # set when a batch completes, cleared once reported
+        self.upload_finished = False  # set by the controller's Drive upload callback
+        self._tree_rows = {}  # file list row id -> (path, is_folder)
+        self._file_rows = {}  # queued file path -> row id (shared by both lists)
+        self._folder_rows = {}  # folder path -> header row id
+        self._rendered_suffix = None  # duration suffix the output rows were built with
+        self._duration_seconds = 3600  # last valid loop duration typed or set
+        self._duration_display_seconds = 3600  # value the next idle display refresh will show
+        self._duration_display_pending = False
+        self._help_window = None  # HelpWindow, hidden rather than destroyed on close
+        self._duration_save_after = None  # pending debounced loop_duration save
+        self._drop_scanning = False  # a dropped batch is being expanded off the Tk thread
+        self._drop_added = 0  # files queued so far by the current drop
+        self._progress_latest = None  # newest (value, message) waiting for the progress pump
         
         # Initialize duration display variable
         default_duration = self.settings_manager.get("ui.loop_duration", "3600")
@@ -134,6 +162,9 @@ class BatchProcessorUI(TkinterDnD.Tk):
         
         # Create and lay out the UI components
         self.create_ui()
+        
+        # Apply progress updates from worker threads at most 20 times a second
+        self.after(50, self._pump_progress)
 
         # Set up focus handling for Alt+Tab
         self.bind("<FocusIn>", self.on_main_focus_in)
@@ -164,6 +195,9 @@ class BatchProcessorUI(TkinterDnD.Tk):
     def create_ui(self):
         # UPDATED: Back to single column layout (no sidebar)
         
+        # Keep the window hidden while building so Tk lays everything out once
+        self.withdraw()
+        
         # Main container with padding
         main_container = ctk.CTkFrame(self, fg_color="transparent")
         main_container.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
@@ -270,7 +304,8 @@ class BatchProcessorUI(TkinterDnD.Tk):
         self.count_label.pack(side="right")
         
         # === Drop Area - SAME AS BEFORE ===
-        self.drop_area = ctk.CTkFrame(main_container, fg_color="#1e1e1e", corner_radius=10)
+        self._drop_area_color = "#1e1e1e"  # Restored after the green success flash
+        self.drop_area = ctk.CTkFrame(main_container, fg_color=self._drop_area_color, corner_radius=10)
         self.drop_area.grid(row=r, column=0, sticky="nsew", pady=(0, 10), padx=5)
         r += 1
         
@@ -313,14 +348,28 @@ class BatchProcessorUI(TkinterDnD.Tk):
         )
         self.drop_indicator.grid(row=1, column=0, pady=10, sticky="ew")
         
-        # Scrollable frame for files
-        self.folder_frame = ctk.CTkScrollableFrame(drop_zone_left, fg_color="transparent")
-        self.folder_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        # Treeview styling - only visible rows are drawn, so large queues stay cheap
+        tree_style = ttk.Style()
+        tree_style.configure("Queue.Treeview",
+                             background="#232323",
+                             fieldbackground="#232323",
+                             foreground="#bbbbbb",
+                             borderwidth=0,
+                             rowheight=26,
+                             font=("Segoe UI", 10))
+        tree_style.map("Queue.Treeview", background=[("selected", "#1f538d")])
+        
+        # File list (selectable)
+        self.file_tree = ttk.Treeview(drop_zone_left, columns=("name",), show="", selectmode="browse", style="Queue.Treeview")
+        self.file_tree.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        self.file_tree.tag_configure("folder", foreground="#00bfff", font=("Segoe UI", 10, "bold"))
+        self.file_tree.bind("<<TreeviewSelect>>", self.on_tree_select)
 
         # Right side - Output Preview
         drop_zone_right = ctk.CTkFrame(drop_area_content, fg_color="#232323", corner_radius=8)
         drop_zone_right.grid(row=0, column=1, sticky="nsew", padx=(5, 0))
         drop_zone_right.grid_columnconfigure(0, weight=1)
+        drop_zone_right.grid_columnconfigure(1, weight=0)  # Shared scrollbar
         drop_zone_right.grid_rowconfigure(0, weight=0)  # Header - fixed
         drop_zone_right.grid_rowconfigure(1, weight=1)  # Output list - expandable
 
@@ -331,29 +380,40 @@ class BatchProcessorUI(TkinterDnD.Tk):
             text_color="#00bfff",
             font=("Segoe UI", 14, "bold")
         )
-        output_header.grid(row=0, column=0, pady=(10, 5), sticky="ew")
-        
-        # Scrollable frame for output files
-        self.output_preview_frame = ctk.CTkScrollableFrame(drop_zone_right, fg_color="transparent")
-        self.output_preview_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
-        
-        # Register drop events
+        output_header.grid(row=0, column=0, columnspan=2, pady=(10, 5), sticky="ew")
+        
+        # Output list (non-selectable), row-for-row with the file list
+        self.output_tree = ttk.Treeview(drop_zone_right, columns=("name",), show="", selectmode="none", style="Queue.Treeview")
+        self.output_tree.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=(0, 10))
+        self.output_tree.tag_configure("folder", foreground="#00bfff", font=("Segoe UI", 10, "bold"))
+        self.output_tree.tag_configure("output", foreground="#8cffb0")
+        
+        # Synchronized scrolling - one scrollbar drives both lists, and scrolling
+        # either list (wheel, keyboard) moves the other with it
+        tree_scrollbar = ttk.Scrollbar(drop_zone_right, orient="vertical")
+        tree_scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 10), pady=(0, 10))
+        
+        def _yview_both(*args):
+            self.file_tree.yview(*args)
+            self.output_tree.yview(*args)
+        
+        def _follow(other):
+            def _on_scroll(first, last):
+                tree_scrollbar.set(first, last)
+                other.yview_moveto(first)
+            return _on_scroll
+        
+        tree_scrollbar.configure(command=_yview_both)
+        self.file_tree.configure(yscrollcommand=_follow(self.output_tree))
+        self.output_tree.configure(yscrollcommand=_follow(self.file_tree))
+        
+        # Register drop events - only the zone; drops on its children (indicator, file list) reach it
         drop_zone_left.drop_target_register(DND_FILES)
         drop_zone_left.dnd_bind("<<Drop>>", self.on_drop)
-        self.drop_indicator.drop_target_register(DND_FILES)
-        self.drop_indicator.dnd_bind("<<Drop>>", self.on_drop)
         
         # Hover effects
-        drop_zone_left.bind("<Enter>", lambda e: drop_zone_left.configure(fg_color="#2a2a2a"))
-        drop_zone_left.bind("<Leave>", lambda e: drop_zone_left.configure(fg_color="#232323"))
-        
-        # Synchronized scrolling
-        def _on_mousewheel(event):
-            self.folder_frame._parent_canvas.yview_scroll(int(-1*(event.delta/20)), "units")
-            self.output_preview_frame._parent_canvas.yview_scroll(int(-1*(event.delta/20)), "units")
-            return "break"
-
-        self.folder_frame.bind_all("<MouseWheel>", _on_mousewheel)
+        drop_zone_left.bind("<Enter>", lambda e: self._set_drop_zone_hover(drop_zone_left, True))
+        drop_zone_left.bind("<Leave>", lambda e: self._set_drop_zone_hover(drop_zone_left, False))
 
         # === File Management Buttons ===
         file_buttons_frame = ctk.CTkFrame(main_container, fg_color="transparent")
@@ -602,6 +662,25 @@ class BatchProcessorUI(TkinterDnD.Tk):
 
         # ADDED: Configure upload access based on admin status
         self._configure_upload_access()
+        
+        # Single geometry pass for the finished tree, then show the window
+        self.update_idletasks()
+        self.deiconify()
+
+    def _set_drop_zone_hover(self, zone, hovered):
+        """Tint the drop zone while hovered, redrawing only when the color actually changes"""
+        if not hovered:
+            # Moving onto the zone's own children (header, file list) also fires <Leave>
+            try:
+                widget = zone.winfo_containing(*zone.winfo_pointerxy())
+            except KeyError:
+                widget = None
+            if widget is not None and (str(widget) + ".").startswith(str(zone) + "."):
+                return
+        
+        color = "#2a2a2a" if hovered else "#232323"
+        if zone.cget("fg_color") != color:
+            zone.configure(fg_color=color)
 
     def on_main_focus_in(self, event):
         """Handle main window getting focus"""
@@ -694,16 +773,14 @@ class BatchProcessorUI(TkinterDnD.Tk):
         duration_input_frame = ctk.CTkFrame(duration_frame, fg_color="transparent")
         duration_input_frame.pack(pady=5)
         
-        self.duration_input = ctk.CTkEntry(duration_input_frame, width=100)
+        self.duration_var = tk.IntVar(value=3600)  # Default to 1 hour
+        self.duration_input = ctk.CTkEntry(duration_input_frame, width=100, textvariable=self.duration_var)
         self.duration_input.pack(side="top", pady=5)
-        self.duration_input.insert(0, "3600")  # Default to 1 hour
         
-        # FIXED: Add proper event bindings for real-time updates
-        self.duration_input.bind("<KeyRelease>", self.validate_and_display_duration)
+        # Every edit (typing, +/- buttons, settings) lands in the trace; bad text is reset on leave/Enter
+        self.duration_var.trace_add("write", self._on_duration_changed)
         self.duration_input.bind("<FocusOut>", self.validate_and_display_duration) 
         self.duration_input.bind("<Return>", self.validate_and_display_duration)
-        # Add immediate update when user finishes typing
-        self.duration_input.bind("<KeyPress>", lambda e: self.after(100, self.validate_and_display_duration))
         
         # Time buttons frame
         time_buttons_frame = ctk.CTkFrame(duration_frame, fg_color="transparent")
@@ -738,123 +815,86 @@ class BatchProcessorUI(TkinterDnD.Tk):
 
     def adjust_duration(self, seconds):
         """Adjust the duration by the specified number of seconds - FIXED VERSION"""
-        try:
-            # Get the current duration
-            current_duration = int(self.duration_input.get())
-            
-            # Calculate the new duration
-            new_duration = current_duration + seconds
-            
-            # Ensure it's at least 1 second
-            new_duration = max(1, new_duration)
-            
-            # Update the entry field
-            self.duration_input.delete(0, tk.END)
-            self.duration_input.insert(0, str(new_duration))
-            
-            # CRITICAL FIX: Force update the display immediately
-            self.update_duration_display(new_duration)
-            
-            # CRITICAL FIX: Update the output preview as well
-            self.update_file_display()
-            
-            # Save the setting immediately
-            try:
-                self.settings_manager.set("ui.loop_duration", str(new_duration))
-            except Exception as e:
-                logging.debug(f"Could not save duration setting: {e}")
-            
-        except ValueError:
-            # If the current value isn't a valid integer, reset to default
-            default_duration = self.settings_manager.get("ui.loop_duration", "3600")
-            self.duration_input.delete(0, tk.END)
-            self.duration_input.insert(0, default_duration)
-            self.update_duration_display(int(default_duration))
-            self.update_file_display()  # Update output preview too
+        # Ensure it's at least 1 second; the trace refreshes the display, preview and setting
+        self.duration_var.set(max(1, self._duration_seconds + seconds))
 
-    def validate_and_display_duration(self, event=None):
-        """Validate the duration input and update the display - COMPLETE FIX"""
+    def _on_duration_changed(self, *args):
+        """React to a new value in the duration entry"""
         current_text = self.duration_input.get().strip()
+        if not (current_text.isascii() and current_text.isdigit()):
+            return  # Empty or partial text while typing - validated on leave/Enter
         
-        # If empty, use default
-        if not current_text:
-            default_duration = self.settings_manager.get("ui.loop_duration", "3600")
-            self.duration_input.delete(0, tk.END)
-            self.duration_input.insert(0, default_duration)
-            self.update_duration_display(int(default_duration))
-            self.update_file_display()  # Update output preview
+        duration = int(current_text)
+        if duration < 1:
             return
         
-        try:
-            # Try to convert to an integer
+        self._duration_seconds = duration
+        
+        # CRITICAL: Always update both displays
+        self.update_duration_display(duration)
+        self.update_file_display()  # Update output preview
+        
+        # Save the duration in settings once typing settles
+        self._schedule_duration_save(duration)
+
+    def validate_and_display_duration(self, event=None):
+        """Validate the duration input and reset it if it isn't a usable number"""
+        current_text = self.duration_input.get().strip()
+        if current_text.isascii() and current_text.isdigit():
             duration = int(current_text)
-            
-            # Enforce minimum value of 1 second
-            if duration < 1:
-                duration = 1
-                self.duration_input.delete(0, tk.END)
-                self.duration_input.insert(0, "1")
-            
-            # CRITICAL: Always update both displays
-            self.update_duration_display(duration)
-            self.update_file_display()  # Update output preview
-            
-            # Save the duration in settings
-            try:
-                self.settings_manager.set("ui.loop_duration", str(duration))
-            except Exception as e:
-                logging.debug(f"Could not save duration setting: {e}")
-            
-        except ValueError:
-            # If not a valid integer, reset to current setting or default
-            try:
-                current_setting = self.settings_manager.get("ui.loop_duration", "3600")
-                self.duration_input.delete(0, tk.END)
-                self.duration_input.insert(0, current_setting)
-                self.update_duration_display(int(current_setting))
-                self.update_file_display()  # Update output preview
-            except:
-                # Final fallback
-                self.duration_input.delete(0, tk.END)
-                self.duration_input.insert(0, "3600")
-                self.update_duration_display(3600)
-                self.update_file_display()  # Update output preview
+        else:
+            # If empty or not a valid integer, reset to current setting or default
+            setting = str(self.settings_manager.get("ui.loop_duration", "3600"))
+            duration = int(setting) if setting.isascii() and setting.isdigit() else 3600
+        
+        # Enforce minimum value of 1 second
+        self.duration_var.set(max(1, duration))
+
+    def _schedule_duration_save(self, duration):
+        """Debounce loop_duration saves - each settings write hits disk"""
+        if self._duration_save_after is not None:
+            self.after_cancel(self._duration_save_after)
+        self._duration_save_after = self.after(300, self._save_duration, duration)
+
+    def _save_duration(self, duration):
+        """Persist the loop duration (runs from the debounce timer)"""
+        self._duration_save_after = None
+        try:
+            self.settings_manager.set("ui.loop_duration", str(duration))
+        except Exception as e:
+            logging.debug(f"Could not save duration setting: {e}")
 
     def update_duration_display(self, seconds):
         """Update the display showing the duration in h:m:s format"""
-        h, m, s = format_duration(seconds)  # Use utils version
-        
-        # Create display text
-        display_text = ""
-        if h > 0:
-            display_text += f"{h}h "
-        if m > 0 or (h > 0 and s > 0):
-            display_text += f"{m}m "
-        if s > 0 or (h == 0 and m == 0):
-            display_text += f"{s}s"
-        
-        # Update the display
-        self.duration_display_var.set(f"({display_text.strip()})")
+        # Several writes in one event (delete + insert, trace + validation) collapse into one
+        self._duration_display_seconds = int(seconds)
+        if not self._duration_display_pending:
+            self._duration_display_pending = True
+            self.after_idle(self._apply_duration_display)
+
+    def _apply_duration_display(self):
+        """Show the latest requested duration (runs once the event loop goes idle)"""
+        self._duration_display_pending = False
+        self.duration_display_var.set(_fmt_duration(self._duration_display_seconds))
 
     def show_help(self):
-        """Show the help window"""
-        help_window = HelpWindow(self)
-        help_window.focus_set()  # Set focus to the help window
+        """Show the help window (built once, then re-shown)"""
+        if self._help_window is None or not self._help_window.winfo_exists():
+            self._help_window = HelpWindow(self)
+        else:
+            self._help_window.deiconify()
+            self._help_window.lift()
+        self._help_window.focus_set()  # Set focus to the help window
 
     def set_duration(self, seconds):
         """Set the duration value"""
-        self.duration_input.delete(0, tk.END)
-        self.duration_input.insert(0, str(seconds))
-        # Update the display too
-        self.update_duration_display(seconds)
+        self.duration_var.set(int(seconds))  # The trace updates the display too
 
     def validate_duration(self, event=None):
         """Validate that duration is a number"""
         current_text = self.duration_input.get()
         if not current_text.isdigit():
-            self.duration_input.delete(0, tk.END)
-            self.duration_input.insert(0, "3600")  # Reset to default
-            self.update_duration_display(3600)  # Update display
+            self.duration_var.set(3600)  # Reset to default
 
     def on_drop(self, event):
         """Handle drag and drop of files with improved feedback"""
@@ -862,39 +902,90 @@ class BatchProcessorUI(TkinterDnD.Tk):
         if self.rendering:
             messagebox.showwarning("Processing in Progress", "Cannot add files while processing.")
             return
+        
+        if self._drop_scanning:
+            return  # Previous drop is still being scanned
             
         file_paths = self.tk.splitlist(event.data)
         
-        # Let controller handle the file processing
-        new_items, duplicates = self.controller.process_dropped_files(file_paths)
-        
-        if duplicates and not new_items:
-            messagebox.showinfo("Skipped Duplicates", "These items were already added:\n" + "\n".join(os.path.basename(p) for p in duplicates))
-            return  # Stop here if everything was duplicate
+        # Let controller handle the file processing in a worker so folder scans don't freeze the UI
+        self._drop_scanning = True
+        self._drop_added = 0
+        self.status_label.configure(text="Scanning dropped items...")
+        threading.Thread(target=self._scan_dropped_files, args=(file_paths,), daemon=True).start()
 
-        if duplicates:
-            messagebox.showinfo("Some Items Skipped", "Some items were already in the queue.")
+    def _scan_dropped_files(self, file_paths):
+        """Worker thread: expand dropped paths, handing files to the UI thread in chunks"""
+        chunk = []
+        duplicate_names = []
+        try:
+            for path, is_duplicate in self.controller.iter_process_dropped_files(file_paths):
+                if is_duplicate:
+                    # Basenames for the duplicate warning are built here, not on the UI thread
+                    duplicate_names.append(os.path.basename(path))
+                    continue
+                
+                chunk.append(path)
+                if len(chunk) >= 100:
+                    self.after(0, self._append_drop_chunk, chunk)
+                    chunk = []
+        except Exception as e:
+            logging.error(f"Error processing dropped files: {e}")
+        
+        if chunk:
+            self.after(0, self._append_drop_chunk, chunk)
+        self.after(0, self._finish_drop, duplicate_names)
 
+    def _append_drop_chunk(self, new_items):
+        """Queue one chunk of scanned drop results (runs on the UI thread)"""
+        if self.rendering:
+            return  # Processing started; the batch's file list is fixed
+        
+        queued = set(self.file_paths)  # Files may have been browsed in while the scan ran
+        new_items = [p for p in new_items if p not in queued]
+        if not new_items:
+            return
+        
         # FIXED: Hide the drop indicator when files are added
-        if new_items:
-            self.drop_indicator.grid_forget()
-
+        self.drop_indicator.grid_forget()
+        
         self.file_paths.extend(new_items)
+        self._drop_added += len(new_items)
+        
+        # Add new items to the UI with side-by-side display, and paint them before the next chunk
+        self.update_file_display()
+        self.status_label.configure(text=f"Scanning dropped items... {self._drop_added} added")
+        self.update_idletasks()
+
+    def _finish_drop(self, duplicate_names):
+        """Wrap up a drop once every chunk has been queued (runs on the UI thread)"""
+        self._drop_scanning = False
+        added = self._drop_added
         
         # Update status label and file count
-        self.update_file_count()
+        if self.file_paths:
+            self.update_file_count()
+        else:
+            self.status_label.configure(text="Drag video files here")
         
-        # Add new items to the UI with side-by-side display
-        self.update_file_display()
+        if duplicate_names and not added:
+            messagebox.showinfo("Skipped Duplicates", "These items were already added:\n" + "\n".join(duplicate_names))
+            return  # Stop here if everything was duplicate
+
+        if duplicate_names:
+            messagebox.showinfo("Some Items Skipped", "Some items were already in the queue.")
         
         # Give visual feedback on successful add
-        if new_items:
-            logging.info(f"Added {len(new_items)} items to queue")
+        if added:
+            logging.info(f"Added {added} items to queue")
             
             # Flash the drop area briefly green for success feedback
-            original_color = self.drop_area.cget("fg_color")
-            self.drop_area.configure(fg_color="#2a5d2a")  # Green for success
-            self.after(500, lambda: self.drop_area.configure(fg_color=original_color))
+            self._flash_drop_area()
+
+    def _flash_drop_area(self):
+        """Briefly tint the drop area green, then restore its construction color"""
+        self.drop_area.configure(fg_color="#2a5d2a")  # Green for success
+        self.after(500, lambda: self.drop_area.configure(fg_color=self._drop_area_color))
 
     def browse_files(self):
         """Browse for MP4 files with improved feedback"""
@@ -933,9 +1024,7 @@ class BatchProcessorUI(TkinterDnD.Tk):
             logging.info(f"Added {len(new_items)} files via browse dialog")
             
             # Visual feedback - flash green
-            original_color = self.drop_area.cget("fg_color")
-            self.drop_area.configure(fg_color="#2a5d2a")  # Green for success
-            self.after(500, lambda: self.drop_area.configure(fg_color=original_color))
+            self._flash_drop_area()
 
     def update_file_count(self):
         """Update the file count display"""
@@ -950,16 +1039,9 @@ class BatchProcessorUI(TkinterDnD.Tk):
             self.count_label.configure(text=f"{count} files queued")
         
         # Update status label
+        # Dropped folders are expanded to their MP4s before queuing, so every entry is a file
         if count > 0:
-            folder_count = sum(1 for path in self.file_paths if os.path.isdir(path))
-            file_count = count - folder_count
-            
-            if folder_count and file_count:
-                self.status_label.configure(text=f"🗂 {folder_count} folders, 📄 {file_count} files queued")
-            elif folder_count:
-                self.status_label.configure(text=f"🗂 {folder_count} folders queued")
-            else:
-                self.status_label.configure(text=f"📄 {file_count} files queued")
+            self.status_label.configure(text=f"📄 {count} files queued")
 
     def browse_output(self):
         """Browse for output folder - UPDATED METHOD"""
@@ -1029,12 +1111,18 @@ class BatchProcessorUI(TkinterDnD.Tk):
         if not self.file_paths:
             messagebox.showwarning("No Files", "No files are queued for processing")
             return
+        
+        if self._drop_scanning:
+            messagebox.showwarning("Still Adding Files", "Dropped folders are still being scanned. Start again when the queue is complete.")
+            return
             
-        if not self.validate_inputs():
+        # Entry values are read once here and reused for the params below
+        inputs = self.validate_inputs()
+        if not inputs:
             return
             
         # Validate song list CSV
-        if not self.controller.handle_song_csv_validation(self.sheet_entry.get().strip()):
+        if not self.controller.handle_song_csv_validation(inputs["sheet_url"]):
             return
         
         # FIXED: Check if we're in distribution mode - improved check
@@ -1085,11 +1173,8 @@ class BatchProcessorUI(TkinterDnD.Tk):
         
         # Get processing parameters
         params = {
-            "file_paths": self.file_paths,
-            "duration": int(self.duration_input.get()),
-            "output_folder": self.output_entry.get().strip(),
-            "music_folder": self.music_entry.get().strip(),
-            "sheet_url": self.sheet_entry.get().strip(),
+            "file_paths": list(self.file_paths),  # Snapshot - the queue can change while the batch runs
+            **inputs,
             "new_song_count": 5 if self.use_default_song_count.get() else int(self.new_song_count_var.get()),
             "export_timestamp": self.export_timestamp_var.get(),
             "fade_audio": self.fade_audio_var.get(),
@@ -1322,11 +1407,17 @@ class BatchProcessorUI(TkinterDnD.Tk):
         search_and_enable(self)
 
     def validate_inputs(self):
-        """Validate all required inputs"""
+        """Validate all required inputs; returns the validated values, or False"""
         # Check duration
-        if not self.duration_input.get().isdigit():
+        duration = self.duration_input.get().strip()
+        if not (duration.isascii() and duration.isdigit()):
             messagebox.showerror("Invalid Input", "Duration must be a number")
             return False
+        
+        # Typed text is only clamped on FocusOut/Return, and the Start button doesn't take focus
+        if int(duration) < 1:
+            messagebox.showerror("Invalid Input", "Duration must be at least 1 second")
+            return False
             
         # Check output folder
         output_folder = self.output_entry.get().strip()
@@ -1357,13 +1448,38 @@ class BatchProcessorUI(TkinterDnD.Tk):
             messagebox.showerror("Invalid Input", "Google Sheet URL is required")
             return False
             
-        return True
+        return {
+            "duration": int(duration),
+            "output_folder": output_folder,
+            "music_folder": music_folder,
+            "sheet_url": sheet_url
+        }
 
     def update_progress(self, value, message=None):
-        """Update progress bar and message"""
-        self.progress_bar["value"] = value
-        if message:
-            self.progress_var.set(message)
+        """Update progress bar and message (safe to call from worker threads)"""
+        # Only the newest update is kept; _pump_progress applies it on the Tk thread
+        pending = self._progress_latest
+        if not message and pending:
+            message = pending[1]
+        self._progress_latest = (value, message)
+
+    def _pump_progress(self):
+        """Apply the newest queued progress update, then reschedule"""
+        latest, self._progress_latest = self._progress_latest, None
+        if latest:
+            value, message = latest
+            self.progress_bar["value"] = value
+            if message:
+                self.progress_var.set(message)
+        
+        self.after(50, self._pump_progress)
+
+    def _finish_progress(self, final_message):
+        """Apply any still-queued progress value, then show the final status text"""
+        latest, self._progress_latest = self._progress_latest, None
+        if latest:
+            self.progress_bar["value"] = latest[0]
+        self.progress_var.set(final_message)
 
     def set_current_file(self, index, filename):
         """Update current file information"""
@@ -1373,7 +1489,8 @@ class BatchProcessorUI(TkinterDnD.Tk):
     def processing_complete(self):
         """Reset UI after processing is complete - UPDATED"""
         self.rendering = False
-        self.progress_var.set("Processing complete")
+        # Called from the worker thread - apply the last queued value (e.g. 100) on the Tk thread
+        self.after(0, self._finish_progress, "Processing complete")
         self.current_file_var.set("")
         
         # Unlock the UI
@@ -1393,8 +1510,8 @@ class BatchProcessorUI(TkinterDnD.Tk):
     def _show_completion_message(self):
         """Show the appropriate completion message"""
         # Check for both processing and upload completion
-        processing_done = hasattr(self, 'processing_finished') and self.processing_finished
-        upload_done = hasattr(self, 'upload_finished') and self.upload_finished
+        processing_done = self.processing_finished
+        upload_done = self.upload_finished
         
         if processing_done or upload_done:
             if processing_done and upload_done:
@@ -1405,10 +1522,8 @@ class BatchProcessorUI(TkinterDnD.Tk):
                 messagebox.showinfo("Complete", "Upload to Google Drive completed")
             
             # Reset the flags
-            if hasattr(self, 'processing_finished'):
-                self.processing_finished = False
-            if hasattr(self, 'upload_finished'):
-                self.upload_finished = False
+            self.processing_finished = False
+            self.upload_finished = False
 
     def stop_processing(self):
         """Stop all processing - UPDATED"""
@@ -1426,7 +1541,7 @@ class BatchProcessorUI(TkinterDnD.Tk):
         self.was_stopped = True
         self.controller.stop_processing()
                 
-        self.progress_var.set("Processing stopped by user")
+        self._finish_progress("Processing stopped by user")
         self.current_file_var.set("")
         
         # Unlock the UI
@@ -1449,13 +1564,7 @@ class BatchProcessorUI(TkinterDnD.Tk):
             self.file_paths = []
             
             # Clear UI elements - both sides
-            for label in self.folder_labels:
-                label.destroy()
-            self.folder_labels = []
-            
-            for label in self.output_preview_labels:
-                label.destroy()
-            self.output_preview_labels = []
+            self._clear_file_display()
             
             self.update_file_count()
             self.current_file_var.set("")
@@ -1503,9 +1612,7 @@ class BatchProcessorUI(TkinterDnD.Tk):
                 self.music_entry.insert(0, settings_dict["music_folder"])
                 
             if "loop_duration" in settings_dict:
-                self.duration_input.delete(0, tk.END)
-                self.duration_input.insert(0, str(settings_dict["loop_duration"]))
-                self.update_duration_display(int(settings_dict.get("loop_duration", 3600)))
+                self.duration_var.set(int(settings_dict["loop_duration"]))
                 
             if "sheet_url" in settings_dict:
                 self.sheet_entry.delete(0, tk.END)
@@ -1652,11 +1759,11 @@ class BatchProcessorUI(TkinterDnD.Tk):
         self.context_menu.add_command(label="Remove Selected", command=self.remove_selected_file)
         self.context_menu.add_command(label="Clear All", command=self.clear_queue)
         
-        # Add context menu to the folder frame
-        self.folder_frame.bind("<Button-3>", self.show_context_menu)
+        # Add context menu to the file list
+        self.file_tree.bind("<Button-3>", self.show_context_menu)
 
     def show_context_menu(self, event):
-        """Show context menu for the folder frame"""
+        """Show context menu for the file list"""
         if not self.file_paths or self.rendering:
             return
         
@@ -1667,20 +1774,12 @@ class BatchProcessorUI(TkinterDnD.Tk):
 
     def update_file_display(self):
         """Update both file lists with easier selection capabilities"""
-        # Clear existing displays
-        for label in self.folder_labels:
-            label.destroy()
-        self.folder_labels = []
-        
-        for label in self.output_preview_labels:
-            label.destroy()
-        self.output_preview_labels = []
-        
         # Deselect any selected file first
         self.deselect_file()
         
         # FIXED: Always check if we should show/hide the drop indicator
         if not self.file_paths:
+            self._clear_file_display()
             # Show the drop indicator when no files
             self.drop_indicator.grid(row=1, column=0, pady=20, sticky="ew")
             self.remove_selected_button.configure(state="disabled")
@@ -1689,136 +1788,92 @@ class BatchProcessorUI(TkinterDnD.Tk):
             # Hide the drop indicator when files exist
             self.drop_indicator.grid_forget()
         
-        duration = 3600  # Default to 3600s (1h) - matches the default input
-        try:
-            if hasattr(self, 'duration_input') and self.duration_input.get().strip():
-                duration_text = self.duration_input.get().strip()
-                if duration_text.isdigit():
-                    duration = int(duration_text)
-                else:
-                    # Fallback to settings if input is invalid
-                    duration = int(self.settings_manager.get("ui.loop_duration", "3600"))
-            else:
-                # If duration_input doesn't exist yet, use settings
-                duration = int(self.settings_manager.get("ui.loop_duration", "3600"))
-        except:
-            duration = 3600  # Final fallback
-        
-        h, m, s = format_duration(duration)
+        # Last valid entry value, kept current by the duration trace
+        h, m, s = format_duration(self._duration_seconds)
         time_suffix = f"{h}h" if h > 0 else ""
         time_suffix += f"{m}m" if m > 0 else ""
         time_suffix += f"{s}s" if s > 0 else ""
+        output_suffix = f"_{time_suffix}.mp4"
+        
+        # Only rows that changed since the last refresh touch Tk
+        queued = set(self.file_paths)
+        for path in [p for p in self._file_rows if p not in queued]:
+            row = self._file_rows.pop(path)
+            self.file_tree.delete(row)
+            self.output_tree.delete(row)
+            del self._tree_rows[row]
+        
+        # Drop folder headers whose files are all gone
+        for folder_path, row in list(self._folder_rows.items()):
+            if not self.file_tree.get_children(row):
+                del self._folder_rows[folder_path]
+                self.file_tree.delete(row)
+                self.output_tree.delete(row)
+                del self._tree_rows[row]
+        
+        # Output names embed the loop duration, so a new duration renames every kept row
+        if output_suffix != self._rendered_suffix:
+            for path, row in self._file_rows.items():
+                self.output_tree.item(row, values=(self._output_row_text(path, output_suffix),))
+            self._rendered_suffix = output_suffix
+        
+        # Add newly queued files under their folder header (created on first use)
+        for file_path in self.file_paths:
+            if file_path in self._file_rows:
+                continue
+            
+            folder_path = os.path.dirname(file_path)
+            folder_row = self._folder_rows.get(folder_path)
+            if folder_row is None:
+                # Left side - selectable folder header; right side - matching output header
+                folder_name = os.path.basename(folder_path)
+                folder_row = self.file_tree.insert("", "end", values=(f"📁 {folder_name}",), tags=("folder",), open=True)
+                self.output_tree.insert("", "end", iid=folder_row, values=(f"📁 {folder_name}",), tags=("folder",), open=True)
+                self._folder_rows[folder_path] = folder_row
+                self._tree_rows[folder_row] = (folder_path, True)
+            
+            # Left side - Original file; right side - Output preview (non-selectable), same row id
+            row = self.file_tree.insert(folder_row, "end", values=(f"    🎬 {os.path.basename(file_path)}",))
+            self.output_tree.insert(folder_row, "end", iid=row, values=(self._output_row_text(file_path, output_suffix),), tags=("output",))
+            self._file_rows[file_path] = row
+            self._tree_rows[row] = (file_path, False)
+
+    def _output_row_text(self, file_path, output_suffix):
+        """Output preview text for a queued file (output_suffix like "_1h.mp4")"""
+        # Queued files always end in .mp4, so the base name is everything before the last dot
+        base_name = os.path.basename(file_path).rpartition(".")[0]
+        return "    ⟹ " + base_name + output_suffix
+
+    def _clear_file_display(self):
+        """Remove every row from both file lists"""
+        self.file_tree.delete(*self.file_tree.get_children())
+        self.output_tree.delete(*self.output_tree.get_children())
+        self._tree_rows = {}
+        self._file_rows = {}
+        self._folder_rows = {}
+
+    def on_tree_select(self, event=None):
+        """Map a file list selection back to its queued path"""
+        selection = self.file_tree.selection()
+        if not selection:
+            return
         
-        # Group files by their parent folder
-        folders_dict = {}
-        for path in self.file_paths:
-            folder_path = os.path.dirname(path)
-            folder_name = os.path.basename(folder_path)
-            
-            if folder_path not in folders_dict:
-                folders_dict[folder_path] = {
-                    "name": folder_name,
-                    "files": []
-                }
-            folders_dict[folder_path]["files"].append(path)
-        
-        # Add all folders and files to both displays
-        for folder_path, folder_data in folders_dict.items():
-            folder_name = folder_data["name"]
-            
-            # Left side - Folder header
-            folder_container = ctk.CTkFrame(self.folder_frame, fg_color="#1e2124", corner_radius=6)
-            folder_container.pack(anchor="w", fill="x", padx=5, pady=3)
-            
-            # Create a selectable folder header with clear visual feedback
-            folder_header = ctk.CTkButton(
-                folder_container, 
-                text=f"📁 {folder_name}",
-                anchor="w",
-                fg_color="transparent",
-                text_color="#00bfff",
-                hover_color="#2a4264",
-                font=("Segoe UI", 12, "bold"),
-                height=30,
-                command=lambda fp=folder_path, btn=None: self.select_item(fp, is_folder=True, button=btn)
-            )
-            folder_header.pack(anchor="w", fill="x", padx=5, pady=(5, 0))
-            folder_header._command = lambda fp=folder_path, btn=folder_header: self.select_item(fp, is_folder=True, button=btn)
-            
-            self.folder_labels.append(folder_container)
-            
-            # Right side - Output folder header (non-selectable)
-            output_folder_container = ctk.CTkFrame(self.output_preview_frame, fg_color="#1e2124", corner_radius=6)
-            output_folder_container.pack(anchor="w", fill="x", padx=5, pady=3)
-            
-            output_folder_header = ctk.CTkLabel(
-                output_folder_container, 
-                text=f"📁 {folder_name}", 
-                anchor="w", 
-                text_color="#00bfff",
-                font=("Segoe UI", 12, "bold")
-            )
-            output_folder_header.pack(anchor="w", fill="x", padx=5, pady=(5, 0))
-            
-            self.output_preview_labels.append(output_folder_container)
-            
-            # Add files with indentation
-            files_container_left = ctk.CTkFrame(folder_container, fg_color="transparent")
-            files_container_left.pack(anchor="w", fill="x", padx=15, pady=(0, 5))
-            
-            files_container_right = ctk.CTkFrame(output_folder_container, fg_color="transparent")
-            files_container_right.pack(anchor="w", fill="x", padx=15, pady=(0, 5))
-            
-            for file_path in folder_data["files"]:
-                # Left side - Original file with button for easier selection
-                file_button = ctk.CTkButton(
-                    files_container_left,
-                    text=f"🎬 {os.path.basename(file_path)}",
-                    anchor="w",
-                    fg_color="transparent",
-                    hover_color="#2a4264",
-                    text_color="#bbb",
-                    height=25,
-                    command=lambda fp=file_path, btn=None: self.select_item(fp, is_folder=False, button=btn)
-                )
-                file_button.pack(anchor="w", fill="x", pady=(0, 2))
-                file_button._command = lambda fp=file_path, btn=file_button: self.select_item(fp, is_folder=False, button=btn)
-                
-                self.folder_labels.append(file_button)
-                
-                # Right side - Output preview (non-selectable)
-                base_name = os.path.splitext(os.path.basename(file_path))[0]
-                output_name = f"{base_name}_{time_suffix}.mp4"
-                
-                output_label = ctk.CTkLabel(
-                    files_container_right, 
-                    text=f"⟹ {output_name}", 
-                    anchor="w", 
-                    text_color="#8cffb0"  # Light green color for output
-                )
-                output_label.pack(anchor="w", fill="x", pady=(0, 2))
-                
-                self.output_preview_labels.append(output_label)
+        path, is_folder = self._tree_rows.get(selection[0], (None, False))
+        if path:
+            self.select_item(path, is_folder=is_folder)
 
-    def select_item(self, path, is_folder=False, button=None):
+    def select_item(self, path, is_folder=False):
         """Select an item (file or folder) with clear visual feedback"""
         if self.rendering:
+            self.deselect_file()
             return
         
-        # Deselect previous selection
-        self.deselect_file()
-        
-        # Store selection information
+        # Store selection information (the Treeview already highlights the row)
         self.selected_file = {
             "path": path,
-            "button": button,
             "is_folder": is_folder
         }
         
-        # Highlight the selected button
-        if button:
-            button.configure(fg_color="#1f538d")
-        
         # Enable remove button
         self.remove_selected_button.configure(state="normal")
         
@@ -1832,11 +1887,11 @@ class BatchProcessorUI(TkinterDnD.Tk):
 
     def deselect_file(self):
         """Remove selection highlight"""
-        if hasattr(self, 'selected_file') and self.selected_file:
-            # Reset highlight on button
-            if self.selected_file.get("button"):
-                self.selected_file["button"].configure(fg_color="transparent")
-            
+        # Reset highlight on the file list
+        if self.file_tree.selection():
+            self.file_tree.selection_set(())
+        
+        if self.selected_file:
             # Clear selection data
             self.selected_file = None
             
@@ -1852,7 +1907,7 @@ class BatchProcessorUI(TkinterDnD.Tk):
 
     def remove_selected_file(self):
         """Remove the selected file or folder from the queue"""
-        if self.rendering or not hasattr(self, 'selected_file') or not self.selected_file:
+        if self.rendering or not self.selected_file:
             return
         
         if self.selected_file["is_folder"]:
@@ -1861,7 +1916,10 @@ class BatchProcessorUI(TkinterDnD.Tk):
             folder_name = os.path.basename(folder_path)
             original_count = len(self.file_paths)
             
-            self.file_paths = [path for path in self.file_paths if os.path.dirname(path) != folder_path]
+            # The folder's files are its child rows, so no dirname() per queued path
+            folder_row = self._folder_rows.get(folder_path)
+            removed = {self._tree_rows[row][0] for row in self.file_tree.get_children(folder_row)} if folder_row else set()
+            self.file_paths = [path for path in self.file_paths if path not in removed]
             removed_count = original_count - len(self.file_paths)
             
             logging.info(f"Removed folder '{folder_name}' containing {removed_count} files")
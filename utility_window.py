@@ -613,9 +613,7 @@ class UtilityWindow(ctk.CTkToplevel):
     def _show_help(self):
         """Show help window"""
         try:
-            from help_window import HelpWindow
-            help_window = HelpWindow(self.parent)
-            help_window.focus_set()
+            self.parent.show_help()  # Reuses the main window's cached help window
         except Exception as e:
             logging.error(f"Error showing help: {e}")
             messagebox.showerror("Error", f"Failed to show help: {e}", parent=self)